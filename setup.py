@@ -12,6 +12,7 @@ setup(
     license="MIT Licence",
     url="https://github.com/ram6ler/python-trotter",
     packages=find_packages(),
+    extras_require={"numpy": ["numpy"]},
     keywords=[
         "combinations",
         "permutations",
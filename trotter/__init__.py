@@ -8,5 +8,12 @@ from .combination import Combinations
 from .combinatoric import Combinatoric
 from .composition import Compositions
 from .compound import Compounds
+from .concat import Concat
+from .cursor import Cursor
+from .map import Map
+from .multiset_combination import MultisetCombinations
+from .multiset_permutation import MultisetPermutations
 from .permutation import Permutations
+from .product import Product
 from .subset import Subsets
+from .view import View
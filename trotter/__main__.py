@@ -1,36 +1,236 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from array import array
+from decimal import Decimal, InvalidOperation
+from itertools import count, islice
+from typing import Iterator
+
 from .amalgam import Amalgams
 from .combination import Combinations
-from .combinatoric import Combinatoric
+from .combinatoric import Combinatoric, _distinct_indices, _random_source
 from .composition import Compositions
 from .compound import Compounds
 from .permutation import Permutations
 from .subset import Subsets
 
+_CLASSES = {
+    "amalgams": Amalgams,
+    "combinations": Combinations,
+    "compositions": Compositions,
+    "permutations": Permutations,
+    "compounds": Compounds,
+    "subsets": Subsets,
+}
+
+_FIXED_LENGTH = {"amalgams", "combinations", "compositions", "permutations"}
+
+_BLOCK = 1 << 13
+
+
+def _integer(text: str) -> int:
+    """A non-negative integer written in decimal or scientific notation (e.g. 1e9)."""
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise argparse.ArgumentTypeError(f"invalid integer: {text!r}")
+    if value != value.to_integral_value() or value < 0:
+        raise argparse.ArgumentTypeError(f"invalid integer: {text!r}")
+    return int(value)
+
+
+def _shard(text: str) -> tuple[int, int]:
+    """A shard written as I/N (the Ith of N shards, counting from 0)."""
+    try:
+        i, n = map(int, text.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard: {text!r}")
+    if not 0 <= i < n:
+        raise argparse.ArgumentTypeError(f"invalid shard: {text!r}")
+    return i, n
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m trotter",
+        description="Write arrangements of items (or the indices of arrangements).",
+    )
+    kinds = parser.add_subparsers(dest="kind", required=True, metavar="kind")
+    for kind in _CLASSES:
+        sub = kinds.add_parser(kind, help=f"{kind} of items")
+        if kind in _FIXED_LENGTH:
+            sub.add_argument("r", type=int, help="number of items in each arrangement")
+        sub.add_argument(
+            "items",
+            help="file with one item per line ('-' for stdin), or with --chars, "
+            "a string of single-character items",
+        )
+        sub.add_argument(
+            "--chars",
+            action="store_true",
+            help="treat items as a string of characters",
+        )
+        sub.add_argument(
+            "--shard",
+            type=_shard,
+            metavar="I/N",
+            help="restrict to the Ith of N consecutive shards",
+        )
+        sub.add_argument("--start", type=_integer, default=0, help="first index")
+        sub.add_argument("--count", type=_integer, help="number of arrangements")
+        sub.add_argument(
+            "--sample",
+            type=_integer,
+            metavar="K",
+            help="write K distinct random arrangements from the selection",
+        )
+        sub.add_argument("--seed", type=int, help="seed for --sample")
+        sub.add_argument(
+            "--rank",
+            action="store_true",
+            help="read arrangements from stdin and write their indices (-1 if "
+            "absent), one per line",
+        )
+        sub.add_argument(
+            "--format",
+            choices=["text", "csv", "ndjson", "binary"],
+            default="text",
+            help="text: one arrangement per line; csv and ndjson: index and "
+            "items; binary: item positions as little-endian unsigned integers "
+            "(1, 2 or 4 bytes, by the number of items), each row prefixed by "
+            "its length for compounds and subsets",
+        )
+        sub.add_argument(
+            "--separator",
+            default=" ",
+            help="separator between items in text lines (default: a space)",
+        )
+    return parser
+
+
+def _items(arguments: argparse.Namespace) -> list[str] | str:
+    """The items named on the command line."""
+    if arguments.chars:
+        return arguments.items
+    if arguments.items == "-":
+        return sys.stdin.read().splitlines()
+    with open(arguments.items) as file:
+        return file.read().splitlines()
+
+
+def _selection(combinatoric: Combinatoric, arguments: argparse.Namespace):
+    """The view of combinatoric selected by --shard, --start and --count."""
+    selection = combinatoric[:]
+    if arguments.shard is not None:
+        i, n = arguments.shard
+        selection = selection.shards(n)[i]
+    stop = None if arguments.count is None else arguments.start + arguments.count
+    return selection[arguments.start : stop]
+
+
+def _rows(selection, arguments: argparse.Namespace) -> Iterator[tuple[int, tuple]]:
+    """The (index, positions) rows to write."""
+    indices = selection._indices
+    if arguments.sample is None:
+        return zip(count(indices.start), selection)
+    source = _random_source(arguments.seed)
+    return (
+        (indices[k], selection[k])
+        for k in islice(_distinct_indices(selection._length, source), arguments.sample)
+    )
+
+
+def _text_blocks(rows, items, arguments: argparse.Namespace) -> Iterator[str]:
+    """Blocks of lines for rows in a text format."""
+    join = "".join if isinstance(items, str) else arguments.separator.join
+    if arguments.format == "text":
+
+        def line(k, positions):
+            return join([items[p] for p in positions]) + "\n"
+
+    elif arguments.format == "ndjson":
+
+        def line(k, positions):
+            arrangement = [items[p] for p in positions]
+            if isinstance(items, str):
+                arrangement = "".join(arrangement)
+            return json.dumps({"index": k, "arrangement": arrangement}) + "\n"
+
+    else:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+
+        def line(k, positions):
+            writer.writerow([k] + [items[p] for p in positions])
+            text = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return text
+
+    while block := [line(k, positions) for k, positions in islice(rows, _BLOCK)]:
+        yield "".join(block)
+
+
+def _binary_blocks(rows, n: int, prefixed: bool) -> Iterator[bytes]:
+    """Blocks of packed positions for rows."""
+    # Positions are below n, but a length prefix can be n itself.
+    largest = n if prefixed else n - 1
+    typecode = "B" if largest < 1 << 8 else "H" if largest < 1 << 16 else "I"
+    while True:
+        block = array(typecode)
+        for _, positions in islice(rows, _BLOCK):
+            if prefixed:
+                block.append(len(positions))
+            block.extend(positions)
+        if not block:
+            return
+        if sys.byteorder != "little":
+            block.byteswap()
+        yield block.tobytes()
+
 
-def test1() -> None:
-    items = "-o#*+"
-    k = 3
+def _rank_blocks(combinatoric: Combinatoric, arguments, items) -> Iterator[str]:
+    """Blocks of lines with the index of each arrangement read from stdin."""
+    lines = (line.rstrip("\n") for line in sys.stdin)
 
-    def tower(cs: Combinatoric) -> None:
-        print(repr(cs))
-        print(str(cs))
-        for i, c in enumerate(cs):
-            index = cs.index(c)
-            a = str(i).rjust(5)
-            b = str(c).center(5)
-            c = str(index).ljust(5)
-            print(f"{a}{b}{c}")
+    def arrangement(line: str) -> list[str] | str:
+        return line if isinstance(items, str) else line.split(arguments.separator)
 
-        print("-" * 60)
+    while block := [
+        f"{combinatoric.index(arrangement(line))}\n" for line in islice(lines, _BLOCK)
+    ]:
+        yield "".join(block)
 
-    for c_2 in [Amalgams, Combinations, Compositions, Permutations]:
-        c2s: Combinatoric = c_2(k, items)
-        tower(c2s)
 
-    for c_1 in [Compounds, Subsets]:
-        c1s: Combinatoric = c_1(items)
-        tower(c1s)
+def main(argv: list[str] | None = None) -> None:
+    arguments = _parser().parse_args(argv)
+    items = _items(arguments)
+    cls = _CLASSES[arguments.kind]
+    r = (arguments.r,) if arguments.kind in _FIXED_LENGTH else ()
+    out = sys.stdout.buffer
+    try:
+        if arguments.rank:
+            for block in _rank_blocks(cls(*r, items), arguments, items):
+                out.write(block.encode())
+        else:
+            selection = _selection(cls(*r, items, output="positions"), arguments)
+            rows = _rows(selection, arguments)
+            if arguments.format == "binary":
+                prefixed = arguments.kind not in _FIXED_LENGTH
+                for block in _binary_blocks(rows, len(items), prefixed):
+                    out.write(block)
+            else:
+                for block in _text_blocks(rows, items, arguments):
+                    out.write(block.encode())
+        out.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); stop quietly.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    test1()
+    main()
@@ -1,9 +1,23 @@
+from typing import Iterator
+
+from .batch import (
+    _amalgam_positions_many,
+    _amalgam_indices_many,
+    _gray_amalgam_positions_many,
+    _gray_amalgam_indices_many,
+)
 from .helpers import (
-    _arrangement,
-    _adjusted_index,
-    _items_exist_in_universal,
-    _amalgam,
-    _inverse_amalgam,
+    _checked_positions,
+    _item_positions,
+    _amalgam_positions,
+    _amalgam_index,
+    _amalgams_from,
+    _amalgams_before,
+    _amalgam_tuples,
+    _gray_amalgam_positions,
+    _gray_amalgam_index,
+    _gray_amalgams_from,
+    _gray_amalgams_before,
 )
 from .combinatoric import Combinatoric
 
@@ -12,24 +26,63 @@ class Amalgams(Combinatoric):
     """A pseudo-list containing amalgams of items.
 
     An amalgam is an arrangement in which order is important and
-    repetition is allowed.
+    repetition is allowed. In "gray" order, successive amalgams differ
+    in one item, by one step along items.
     """
 
-    def __init__(self, r: int, items: list | str):
+    _outputs = ("items", "positions", "index")
+    _orders = ("lexicographic", "gray")
+
+    def __init__(
+        self,
+        r: int,
+        items: list | str,
+        output: str = "items",
+        order: str = "lexicographic",
+    ):
         self._r = r
         self._items = items
+        self._item_positions = _item_positions(items)
+        self._set_output(output)
+        self._set_order(order)
         self._length = len(items) ** r
 
-    def __getitem__(self, k: int | slice) -> list | str:
-        if isinstance(k, slice):
-            return super()._slice(k)
-        else:
-            dummy = _amalgam(
-                _adjusted_index(k, self._length),
-                self._r,
-                self._items,
+    def _positions(self, k: int) -> list[int]:
+        if self._order == "gray":
+            return _gray_amalgam_positions(k, self._r, len(self._items))
+        return _amalgam_positions(k, self._r, len(self._items))
+
+    def _positions_many(self, indices):
+        if self._order == "gray":
+            return _gray_amalgam_positions_many(indices, self._r, len(self._items))
+        return _amalgam_positions_many(indices, self._r, len(self._items))
+
+    def _indices_many(self, positions):
+        if self._order == "gray":
+            return _gray_amalgam_indices_many(
+                positions, len(self._items), self._length
             )
-            return _arrangement(self._items, dummy)
+        return _amalgam_indices_many(positions, len(self._items), self._length)
+
+    def _positions_from(self, k: int) -> Iterator[list[int]]:
+        if self._order == "gray":
+            return _gray_amalgams_from(k, self._r, len(self._items))
+        return _amalgams_from(k, self._r, len(self._items))
+
+    def _positions_before(self, k: int) -> Iterator[list[int]]:
+        if self._order == "gray":
+            return _gray_amalgams_before(k, self._r, len(self._items))
+        return _amalgams_before(k, self._r, len(self._items))
+
+    def _tuples_from(self, k: int, pool) -> Iterator[tuple] | None:
+        if self._order != "lexicographic":
+            return None
+        return _amalgam_tuples(k, self._r, pool)
+
+    def _deltas_from(self, k: int) -> Iterator[tuple]:
+        if self._order != "gray":
+            return super()._deltas_from(k)
+        return _gray_amalgams_from(k, self._r, len(self._items), deltas=True)
 
     def __repr__(self):
         return super()._repr("Amalgams")
@@ -37,8 +90,10 @@ class Amalgams(Combinatoric):
     def __str__(self):
         return super()._str("amalgams")
 
-    def __contains__(self, amalgam: list) -> bool:
-        return _items_exist_in_universal(amalgam, self._items)
+    def _member_positions(self, arrangement: list | str) -> list[int] | None:
+        return _checked_positions(self._lookup(arrangement), self._r, unique=False)
 
-    def index(self, amalgam: list) -> int:
-        return _inverse_amalgam(amalgam, self._items) if amalgam in self else -1
+    def _index(self, positions: list[int]) -> int:
+        if self._order == "gray":
+            return _gray_amalgam_index(positions, len(self._items))
+        return _amalgam_index(positions, len(self._items))
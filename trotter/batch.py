@@ -0,0 +1,411 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is an optional extra.
+    np = None
+
+from .counting import _binomials, _fact
+
+_INT64_MAX = (1 << 63) - 1
+
+
+def _require_numpy() -> None:
+    """Raise an informative error if NumPy is not available."""
+    if np is None:
+        raise ImportError(
+            "Batch operations require NumPy (pip install trotter[numpy])."
+        )
+
+
+def _index_dtype(length: int):
+    """int64 if indices below length fit, otherwise object (Python ints)."""
+    return np.int64 if length - 1 <= _INT64_MAX else object
+
+
+def _indices(indices, length: int):
+    """indices as a 1-D array, mod length (for wraparound)."""
+    _require_numpy()
+    dtype = _index_dtype(length)
+    if not (isinstance(indices, np.ndarray) and indices.dtype.kind == "i"):
+        # Reduce each index as a Python int first: NumPy would turn a list
+        # mixing ints of 2**63 or more with others into (rounded) floats.
+        if isinstance(indices, np.ndarray):
+            indices = indices.ravel().tolist()
+        return np.array([int(k) % length for k in indices], dtype=dtype)
+    indices = indices.ravel().astype(dtype)
+    if length > _INT64_MAX and dtype is not object:
+        # length is 2**63, too large for int64, but k mod 2**63 is just
+        # the low 63 bits of k.
+        return indices & _INT64_MAX
+    return indices % length
+
+
+def _range_indices_many(indices, r: range, length: int):
+    """The elements of r at (an array of) indices, for a pseudo-list of length."""
+    indices = r.start + indices.astype(object) * r.step
+    return indices.astype(_index_dtype(length))
+
+
+def _range_ranks_many(elements, r: range, length: int):
+    """
+    The indices in r (of the given length) of (an array of) elements,
+    with -1 where an element is not in r (or is -1).
+    """
+    offsets = elements - r.start
+    indices = offsets // r.step
+    valid = (
+        (elements != -1) & (offsets % r.step == 0) & (indices >= 0) & (indices < length)
+    )
+    return np.where(valid, indices, -1)
+
+
+def _table(r: int, n: int, cap: int):
+    """
+    Combinations counts of r items taken from 0, 1, ..., n - 1 as an
+    array, with values above cap (no index can reach them) clipped.
+    """
+    row = [min(d, cap) for d in _binomials(r, n)]
+    return np.array(row, dtype=_index_dtype(cap))
+
+
+def _amalgam_positions_many(indices, r: int, n: int):
+    """Positions of the amalgams of r elements taken from n at indices."""
+    positions = np.empty((len(indices), r), dtype=np.int64)
+    for i in range(r - 1, -1, -1):
+        positions[:, i] = indices % n
+        indices = indices // n
+    return positions
+
+
+def _combination_positions_many(indices, r: int, n: int):
+    """Positions of the combinations of r elements taken from n at indices."""
+    positions = np.empty((len(indices), r), dtype=np.int64)
+    if len(indices) == 0 or r == 0:
+        return positions
+    cap = _binomials(r, n + 1)[n] + 1
+    k = indices.copy()
+    start = np.zeros(len(indices), dtype=np.int64)
+    for i in range(r):
+        # With slot i at start or later, the combinations with slot i
+        # before p number C(n - start, j) - C(n - p, j), where j = r - i.
+        # Find the greatest p for which that count does not exceed k.
+        table = _table(r - i, n + 1, cap)
+        before = table[n - start]
+        m = np.searchsorted(table, before - k, side="left")
+        k -= before - table[m]
+        positions[:, i] = n - m
+        start = n - m + 1
+    return positions
+
+
+def _revolving_door_positions_many(indices, r: int, n: int):
+    """
+    Positions of the combinations of r elements taken from n at indices,
+    in revolving door order.
+    """
+    positions = np.empty((len(indices), r), dtype=np.int64)
+    if len(indices) == 0 or r == 0:
+        return positions
+    cap = _binomials(r, n + 1)[n] + 1
+    k = indices.copy()
+    for j in range(r, 0, -1):
+        # The largest position is the greatest m with C(m, j) <= k (see
+        # _revolving_door_positions).
+        table = _table(j, n + 1, cap)
+        m = np.searchsorted(table, k, side="right") - 1
+        k = _table(j, n + 2, cap)[m + 1] - 1 - k
+        positions[:, j - 1] = m
+    return positions
+
+
+def _composition_positions_many(indices, r: int, n: int):
+    """Positions of the compositions of r elements taken from n at indices."""
+    positions = _combination_positions_many(indices, r, n + r - 1)
+    positions -= np.arange(r, dtype=np.int64)
+    return positions
+
+
+def _johnson_trotter_many(indices, combinations):
+    """
+    The Johnson-Trotter permutations at indices of the rows of
+    combinations.
+    """
+    count, r = combinations.shape
+    rows = np.arange(count)
+    positions = np.empty_like(combinations)
+    free = np.ones((count, r), dtype=bool)
+    # Element m - 1 lies at an offset among the slots left free by the
+    # elements after it, so place from the last element down.
+    offsets = []
+    for m in range(r, 1, -1):
+        digits = indices % m
+        indices = indices // m
+        offsets.append(np.where(indices % 2 == 0, m - digits - 1, digits))
+    offsets.append(np.zeros(count, dtype=np.int64))
+    for m, offset in zip(range(r, 0, -1), offsets):
+        offset = offset.astype(np.int64)
+        chosen = free & (np.cumsum(free, axis=1) == offset[:, None] + 1)
+        slots = np.argmax(chosen, axis=1)
+        free[rows, slots] = False
+        positions[rows, slots] = combinations[:, m - 1]
+    return positions
+
+
+def _permutation_positions_many(indices, r: int, n: int):
+    """Positions of the permutations of r elements taken from n at indices."""
+    f = _fact(r)
+    return _johnson_trotter_many(
+        indices % f, _combination_positions_many(indices // f, r, n)
+    )
+
+
+def _gray_amalgam_positions_many(indices, r: int, n: int):
+    """
+    Positions of the amalgams of r elements taken from n at indices, in
+    reflected Gray code order.
+    """
+    positions = np.empty((len(indices), r), dtype=np.int64)
+    for i in range(r - 1, -1, -1):
+        digits = indices % n
+        indices = indices // n
+        positions[:, i] = np.where(indices % 2 == 1, n - 1 - digits, digits)
+    return positions
+
+
+def _subset_positions_many(indices, n: int):
+    """
+    Positions of the subsets of n elements at indices, padded with -1
+    to n columns.
+    """
+    shifts = np.arange(n, dtype=indices.dtype)
+    bits = ((indices[:, None] >> shifts) & 1).astype(bool)
+    # A stable sort brings the set bits to the front, in position order.
+    positions = np.argsort(~bits, axis=1, kind="stable").astype(np.int64)
+    positions[np.arange(n) >= bits.sum(axis=1)[:, None]] = -1
+    return positions
+
+
+def _gray_subset_positions_many(indices, n: int):
+    """
+    Positions of the subsets of n elements at indices, in Gray code
+    order, padded with -1 to n columns.
+    """
+    return _subset_positions_many(indices ^ (indices >> 1), n)
+
+
+def _compound_positions_many(indices, offsets: list[int]):
+    """
+    Positions of the compounds of n elements at indices, padded with -1
+    to n columns, where offsets are the indices of the first compound of
+    each length.
+    """
+    n = len(offsets) - 2
+    offsets = np.array(offsets[:-1], dtype=indices.dtype)
+    lengths = np.searchsorted(offsets, indices, side="right") - 1
+    positions = np.full((len(indices), n), -1, dtype=np.int64)
+    for r in np.unique(lengths):
+        rows = lengths == r
+        positions[rows, :r] = _permutation_positions_many(
+            indices[rows] - offsets[r], int(r), n
+        )
+    return positions
+
+
+def _positions_by_row(indices, positions, width: int):
+    """
+    Positions of the arrangements at indices, found one at a time by
+    positions(k) and padded with -1 to width columns.
+    """
+    rows = np.full((len(indices), width), -1, dtype=np.int64)
+    for row, k in zip(rows, indices.tolist()):
+        found = positions(k)
+        row[: len(found)] = found
+    return rows
+
+
+def _indices_by_row(positions, index, length: int):
+    """
+    Indices of the arrangements at (rows of) positions, found one at a
+    time by index(row), which gives -1 for arrangements not present.
+    """
+    return np.array(
+        [index(row) for row in positions.tolist()], dtype=_index_dtype(length)
+    )
+
+
+def _positions_array(arrangements, member_positions, width: int):
+    """
+    A 2-D array of positions, one row of width columns per arrangement,
+    padded with -1 (with -2 marking arrangements for which
+    member_positions gives None). NumPy arrays are taken to hold
+    positions already.
+    """
+    _require_numpy()
+    if isinstance(arrangements, np.ndarray):
+        positions = arrangements.astype(np.int64).reshape(len(arrangements), -1)
+        if positions.shape[1] > width:
+            raise ValueError(f"Rows of positions have at most {width} columns.")
+        padding = np.full((len(positions), width - positions.shape[1]), -1)
+        return np.hstack([positions, padding])
+
+    positions = np.full((len(arrangements), width), -1, dtype=np.int64)
+    for row, arrangement in zip(positions, arrangements):
+        member = member_positions(arrangement)
+        if member is None:
+            row[0] = -2
+        else:
+            row[: len(member)] = member
+    return positions
+
+
+def _unique_rows(positions):
+    """Whether the nonnegative elements in each row of positions are unique."""
+    ordered = np.sort(positions, axis=1)
+    repeated = (ordered[:, 1:] == ordered[:, :-1]) & (ordered[:, 1:] >= 0)
+    return ~repeated.any(axis=1)
+
+
+def _within(positions, n: int, padded: bool = False):
+    """Whether each row of positions lies in 0, ..., n - 1 (or is -1 padding)."""
+    return ((positions >= (-1 if padded else 0)) & (positions < n)).all(axis=1)
+
+
+def _amalgam_indices_many(positions, n: int, length: int):
+    """Indices of the amalgams at positions (-1 where not amalgams)."""
+    valid = _within(positions, n)
+    indices = np.zeros(len(positions), dtype=_index_dtype(length))
+    for column in np.where(valid[:, None], positions, 0).T:
+        indices = indices * n + column
+    return np.where(valid, indices, -1)
+
+
+def _gray_amalgam_indices_many(positions, n: int, length: int):
+    """
+    Indices of the amalgams at positions in reflected Gray code order
+    (-1 where not amalgams).
+    """
+    valid = _within(positions, n)
+    indices = np.zeros(len(positions), dtype=_index_dtype(length))
+    for column in np.where(valid[:, None], positions, 0).T:
+        indices = indices * n + np.where(indices % 2 == 1, n - 1 - column, column)
+    return np.where(valid, indices, -1)
+
+
+def _combination_ranks(positions, n: int, length: int):
+    """Indices of the combinations at (valid, sorted) positions."""
+    count, r = positions.shape
+    indices = np.zeros(count, dtype=_index_dtype(length))
+    start = np.zeros(count, dtype=np.int64)
+    for i in range(r):
+        # Skipped: C(n - start, j) - C(n - p, j) (see unranking above).
+        table = _table(r - i, n + 1, length + 1)
+        indices += table[n - start] - table[n - positions[:, i]]
+        start = positions[:, i] + 1
+    return indices
+
+
+def _combination_indices_many(positions, r: int, n: int, length: int):
+    """Indices of the combinations at positions (-1 where not combinations)."""
+    ordered = np.sort(positions, axis=1)
+    valid = _within(ordered, n) & _unique_rows(ordered)
+    ordered[~valid] = np.arange(r)
+    return np.where(valid, _combination_ranks(ordered, n, length), -1)
+
+
+def _revolving_door_indices_many(positions, r: int, n: int, length: int):
+    """
+    Indices of the combinations at positions in revolving door order (-1
+    where not combinations).
+    """
+    ordered = np.sort(positions, axis=1)
+    valid = _within(ordered, n) & _unique_rows(ordered)
+    ordered[~valid] = np.arange(r)
+    indices = np.zeros(len(positions), dtype=_index_dtype(length))
+    for j in range(1, r + 1):
+        table = _table(j, n + 1, length + 1)
+        indices = table[ordered[:, j - 1] + 1] - 1 - indices
+    return np.where(valid, indices, -1)
+
+
+def _composition_indices_many(positions, r: int, n: int, length: int):
+    """Indices of the compositions at positions (-1 where not compositions)."""
+    ordered = np.sort(positions, axis=1)
+    valid = _within(ordered, n)
+    ordered[~valid] = 0
+    ordered += np.arange(r, dtype=np.int64)
+    return np.where(valid, _combination_ranks(ordered, n + r - 1, length), -1)
+
+
+def _johnson_trotter_ranks(positions, length: int):
+    """Johnson-Trotter indices of (valid) rows of positions among their own sort."""
+    count, r = positions.shape
+    # slots[:, v] is where the vth smallest element of a row lies.
+    slots = np.argsort(positions, axis=1)
+    indices = np.zeros(count, dtype=_index_dtype(length))
+    for m in range(2, r + 1):
+        offset = (slots[:, : (m - 1)] < slots[:, (m - 1) : m]).sum(axis=1)
+        digits = np.where(indices % 2 == 0, m - offset - 1, offset)
+        indices = indices * m + digits
+    return indices
+
+
+def _permutation_ranks(positions, n: int, length: int):
+    """Indices of the permutations at (valid) positions."""
+    r = positions.shape[1]
+    groups = _combination_ranks(np.sort(positions, axis=1), n, length)
+    return groups * _fact(r) + _johnson_trotter_ranks(positions, length)
+
+
+def _permutation_indices_many(positions, r: int, n: int, length: int):
+    """Indices of the permutations at positions (-1 where not permutations)."""
+    valid = _within(positions, n) & _unique_rows(positions)
+    positions = positions.copy()
+    positions[~valid] = np.arange(r)
+    return np.where(valid, _permutation_ranks(positions, n, length), -1)
+
+
+def _subset_indices_many(positions, n: int, length: int):
+    """Indices of the subsets at (padded) positions (-1 where not subsets)."""
+    valid = _within(positions, n, padded=True) & _unique_rows(positions)
+    weights = np.array([1 << j for j in range(n)] + [0], dtype=_index_dtype(length))
+    # Padding (-1) picks up the trailing zero weight.
+    indices = weights[np.where(valid[:, None], positions, -1)].sum(axis=1)
+    return np.where(valid, indices, -1)
+
+
+def _gray_subset_indices_many(positions, n: int, length: int):
+    """
+    Indices of the subsets at (padded) positions in Gray code order (-1
+    where not subsets).
+    """
+    indices = _subset_indices_many(positions, n, length)
+    valid = indices != -1
+    shift = 1
+    while shift < n:
+        indices ^= indices >> shift
+        shift *= 2
+    return np.where(valid, indices, -1)
+
+
+def _compound_indices_many(positions, offsets: list[int]):
+    """
+    Indices of the compounds at (padded) positions (-1 where not
+    compounds), where offsets are the indices of the first compound of
+    each length.
+    """
+    n = len(offsets) - 2
+    length = offsets[-1]
+    present = positions >= 0
+    valid = (
+        _within(positions, n, padded=True)
+        & _unique_rows(positions)
+        & ~(present[:, 1:] & ~present[:, :-1]).any(axis=1)
+    )
+    lengths = present.sum(axis=1)
+    indices = np.full(len(positions), -1, dtype=_index_dtype(length))
+    for r in range(n + 1):
+        rows = valid & (lengths == r)
+        if rows.any():
+            indices[rows] = offsets[r] + _permutation_ranks(
+                positions[rows, :r], n, length
+            )
+    return indices
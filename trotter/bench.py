@@ -0,0 +1,182 @@
+"""
+Benchmarks for trotter's pseudo-lists.
+
+Run with `python -m trotter.bench` to time construction, lookup
+(`__getitem__` at small and at large, possibly bigint, indices),
+`index`, `in`, iteration, slicing and `random()` for each class over a
+grid of sizes. Results are written as JSON; pass `--compare` with an
+earlier results file to see the ratio of each timing to its baseline.
+"""
+
+import argparse
+import json
+import platform
+import sys
+from functools import partial
+from itertools import islice
+from random import Random
+from time import perf_counter
+from typing import Callable
+
+from .amalgam import Amalgams
+from .combination import Combinations
+from .combinatoric import Combinatoric
+from .composition import Compositions
+from .compound import Compounds
+from .permutation import Permutations
+from .subset import Subsets
+
+_SIZES = {
+    "quick": {"fixed": [(10, 3), (100, 5)], "free": [8, 32]},
+    "full": {"fixed": [(10, 3), (100, 5), (1000, 50)], "free": [8, 64, 512]},
+}
+
+_ITERATED = 10_000
+
+
+def _cases(size: str) -> list[tuple[str, Callable[[], Combinatoric]]]:
+    """(name, constructor) for each pseudo-list benchmarked."""
+    cases = []
+    for cls in [Amalgams, Combinations, Compositions, Permutations]:
+        for n, r in _SIZES[size]["fixed"]:
+            items = list(range(n))
+            name = f"{cls.__name__}(n={n}, r={r})"
+            cases.append((name, partial(cls, r, items)))
+    for cls in [Compounds, Subsets]:
+        for n in _SIZES[size]["free"]:
+            items = list(range(n))
+            cases.append((f"{cls.__name__}(n={n})", partial(cls, items)))
+    return cases
+
+
+def _operations(
+    construct: Callable[[], Combinatoric]
+) -> dict[str, tuple[Callable[[], object], int]]:
+    """(function, number of operations per call) for each timing of a case."""
+    combinatoric = construct()
+    length = combinatoric._length
+    small = [k % length for k in range(0, 1 << 16, 997)]
+    large = [(length * (2 * i + 1)) // 128 for i in range(64)]
+    arrangements = [combinatoric[k] for k in large]
+    # The items are integers, so a string never matches one of them.
+    absent = list(arrangements[0][:-1]) + ["absent"]
+    start = large[len(large) // 2]
+    generator = Random(0)
+    return {
+        "construct": (construct, 1),
+        "getitem_small": (lambda: [combinatoric[k] for k in small], len(small)),
+        "getitem_large": (lambda: [combinatoric[k] for k in large], len(large)),
+        "index": (lambda: [combinatoric.index(a) for a in arrangements], len(large)),
+        "contains": (
+            lambda: [a in combinatoric for a in arrangements] + [absent in combinatoric],
+            len(large) + 1,
+        ),
+        "iterate": (
+            lambda: sum(1 for _ in islice(iter(combinatoric), _ITERATED)),
+            min(length, _ITERATED),
+        ),
+        "slice": (
+            lambda: list(combinatoric[start : start + _ITERATED]),
+            min(length - start, _ITERATED),
+        ),
+        "slice_step": (
+            lambda: list(combinatoric[start : start + 100 * 7 : 7]),
+            len(range(start, min(length, start + 100 * 7), 7)),
+        ),
+        "random": (lambda: [combinatoric.random(generator) for _ in range(64)], 64),
+    }
+
+
+def _measure(func: Callable[[], object], repeat: int, budget: float) -> float:
+    """The best time, over repeat runs of at least budget seconds, of one call."""
+    number = 1
+    while True:
+        began = perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = perf_counter() - began
+        if elapsed >= budget:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        began = perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (perf_counter() - began) / number)
+    return best
+
+
+def run(size: str = "full", repeat: int = 3, budget: float = 0.05) -> dict:
+    """
+    Benchmark results: seconds per operation for each case and timing,
+    with details of the environment.
+    """
+    results = {}
+    for name, construct in _cases(size):
+        for operation, (func, count) in _operations(construct).items():
+            seconds = _measure(func, repeat, budget) / max(count, 1)
+            results[f"{name} {operation}"] = seconds
+            print(f"{name} {operation}: {seconds:.3e} s", file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "size": size,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Lines comparing current results with baseline results (ratios above
+    threshold marked as regressions).
+    """
+    lines = []
+    for key, seconds in current["results"].items():
+        if key not in baseline["results"]:
+            continue
+        ratio = seconds / baseline["results"][key]
+        mark = "  REGRESSION" if ratio > threshold else ""
+        lines.append(f"{ratio:8.2f}x  {key}{mark}")
+    return lines
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m trotter.bench", description="Benchmark trotter."
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="use a smaller grid of sizes"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs per timing")
+    parser.add_argument(
+        "--budget", type=float, default=0.05, help="minimum seconds per run"
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare with results in this JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="ratio to baseline reported as a regression (default: 1.25)",
+    )
+    arguments = parser.parse_args(argv)
+    size = "quick" if arguments.quick else "full"
+    current = run(size, arguments.repeat, arguments.budget)
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(current, file, indent=2)
+    else:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            lines = compare(current, json.load(file), arguments.threshold)
+        print("\n".join(lines), file=sys.stderr)
+        if any(line.endswith("REGRESSION") for line in lines):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,119 @@
+from typing import Iterator
+
+from .batch import (
+    _indices_by_row,
+    _positions_by_row,
+    _combination_positions_many,
+    _combination_indices_many,
+    _revolving_door_positions_many,
+    _revolving_door_indices_many,
+)
 from .helpers import (
-    _adjusted_index,
-    _arrangement,
-    _n_c_r,
-    _items_are_unique,
-    _items_exist_in_universal,
-    _combination,
-    _inverse_combination,
+    _checked_positions,
+    _item_positions,
+    _combination_positions,
+    _combination_index,
+    _combinations_from,
+    _combinations_before,
+    _combination_tuples,
+    _revolving_door_positions,
+    _revolving_door_index,
+    _revolving_doors_from,
+    _revolving_doors_before,
+    _constrained_positions,
+    _free_slots,
+    _constrained_combinations_from,
+    _constrained_combinations_before,
 )
 from .combinatoric import Combinatoric
+from .counting import _n_c_r
 
 
 class Combinations(Combinatoric):
     """A pseudo-list containing combinations of items.
 
     A combination is an arrangement in which order is not important and
-    repetition is not allowed.
+    repetition is not allowed. In "revolving_door" order, successive
+    combinations differ by exchanging one item. Combinations may be
+    constrained to include every one of the required items and none of
+    the forbidden items; only those are counted and indexed.
     """
 
-    def __init__(self, r: int, items: list | str):
+    _outputs = ("items", "positions", "bitmask")
+    _orders = ("lexicographic", "revolving_door")
+
+    def __init__(
+        self,
+        r: int,
+        items: list | str,
+        output: str = "items",
+        order: str = "lexicographic",
+        required: list | str | None = None,
+        forbidden: list | str | None = None,
+    ):
         self._r = r
         self._items = items
-        self._length = _n_c_r(len(items), r)
-
-    def __getitem__(self, k: int | slice) -> list | str:
-        if isinstance(k, slice):
-            return super()._slice(k)
+        self._item_positions = _item_positions(items)
+        self._set_output(output)
+        self._set_order(order)
+        self._set_constraints(required, forbidden)
+        if self._constraints is None:
+            self._length = _n_c_r(len(items), r)
         else:
-            dummy = _combination(
-                _adjusted_index(k, self._length),
-                self._r,
-                self._items,
+            required, free, _ = self._constraints
+            r -= len(required)
+            self._length = _n_c_r(len(free), r) if r >= 0 else 0
+
+    def _positions(self, k: int) -> list[int]:
+        if self._constraints is not None:
+            required, free, _ = self._constraints
+            slots = _combination_positions(k, self._r - len(required), len(free))
+            return _constrained_positions(slots, self._constraints)
+        if self._order == "revolving_door":
+            return _revolving_door_positions(k, self._r, len(self._items))
+        return _combination_positions(k, self._r, len(self._items))
+
+    def _positions_many(self, indices):
+        if self._constraints is not None:
+            return _positions_by_row(indices, self._positions, self._r)
+        if self._order == "revolving_door":
+            return _revolving_door_positions_many(indices, self._r, len(self._items))
+        return _combination_positions_many(indices, self._r, len(self._items))
+
+    def _indices_many(self, positions):
+        if self._constraints is not None:
+            return _indices_by_row(positions, self._row_index, self._length)
+        if self._order == "revolving_door":
+            return _revolving_door_indices_many(
+                positions, self._r, len(self._items), self._length
             )
-            return _arrangement(self._items, dummy)
+        return _combination_indices_many(
+            positions, self._r, len(self._items), self._length
+        )
+
+    def _positions_from(self, k: int) -> Iterator[list[int]]:
+        if self._constraints is not None:
+            return _constrained_combinations_from(k, self._r, self._constraints)
+        if self._order == "revolving_door":
+            return _revolving_doors_from(k, self._r, len(self._items))
+        return _combinations_from(k, self._r, len(self._items))
+
+    def _positions_before(self, k: int) -> Iterator[list[int]]:
+        if self._constraints is not None:
+            return _constrained_combinations_before(k, self._r, self._constraints)
+        if self._order == "revolving_door":
+            return _revolving_doors_before(k, self._r, len(self._items))
+        return _combinations_before(k, self._r, len(self._items))
+
+    def _tuples_from(self, k: int, pool) -> Iterator[tuple] | None:
+        if self._order != "lexicographic" or self._constraints is not None:
+            return None
+        return _combination_tuples(k, self._r, pool)
+
+    def _deltas_from(self, k: int) -> Iterator[tuple]:
+        if self._order != "revolving_door":
+            return super()._deltas_from(k)
+        return _revolving_doors_from(k, self._r, len(self._items), deltas=True)
 
     def __repr__(self):
         return super()._repr("Combinations")
@@ -39,14 +121,19 @@ class Combinations(Combinatoric):
     def __str__(self):
         return super()._str("combinations")
 
-    def __contains__(self, combination: list) -> bool:
-        return _items_exist_in_universal(
-            combination, self._items
-        ) and _items_are_unique(combination)
+    def _member_positions(self, arrangement: list | str) -> list[int] | None:
+        return self._allowed(self._lookup(arrangement))
 
-    def index(self, combination: list) -> int:
-        return (
-            _inverse_combination(combination, self._items)
-            if combination in self
-            else -1
-        )
+    def _allowed(self, positions: list[int] | None) -> list[int] | None:
+        positions = _checked_positions(positions, self._r, unique=True)
+        if positions is None or self._constraints is None:
+            return positions
+        return None if _free_slots(positions, self._constraints) is None else positions
+
+    def _index(self, positions: list[int]) -> int:
+        if self._constraints is not None:
+            slots = _free_slots(positions, self._constraints)
+            return _combination_index(slots, len(self._constraints[1]))
+        if self._order == "revolving_door":
+            return _revolving_door_index(sorted(positions))
+        return _combination_index(sorted(positions), len(self._items))
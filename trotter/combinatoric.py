@@ -1,20 +1,79 @@
-from random import randint
-from .helpers import _adjusted_index, _arrangement
+from functools import partial
+from itertools import islice
+import random
+from random import Random
+from typing import Any, Callable, Iterator
+from .batch import _INT64_MAX, _indices, _positions_array, np
+from .helpers import (
+    _adjusted_index,
+    _arrangement,
+    _constraints,
+    _positioned_arrangement,
+    _positions_of,
+    _subset_index,
+    _subset_positions,
+)
+from .parallel import _parallel_map, _parallel_reduce
 
 
-def _fast_dice_roller(n: int) -> int:
-    # Uses Fast Dice Roller algorithm.
-    # See Lumbroso, J. (2012)
-    #   Optimal Discrete Uniform Generation from Coin Flips, and Applications.
-    v, c = 1, 0
+def _random_source(seed):
+    """
+    A source of random bits: the random module (for None), a
+    random.Random seeded with seed (for an int), or seed itself (a
+    random.Random or numpy.random.Generator).
+    """
+    if seed is None:
+        return random
+    if isinstance(seed, int):
+        return Random(seed)
+    return seed
+
+
+def _random_below(n: int, source) -> int:
+    """
+    A uniformly random integer below n, drawn from source as a block of
+    bits at a time (rejecting blocks of n or more).
+    """
+    if n <= 0:
+        raise IndexError("Cannot choose from an empty pseudo-list.")
+    bits = (n - 1).bit_length()
+    if hasattr(source, "getrandbits"):
+        draw = source.getrandbits
+    else:
+        size = (bits + 7) // 8
+        extra = 8 * size - bits
+
+        def draw(bits: int) -> int:
+            return int.from_bytes(source.bytes(size), "little") >> extra
+
     while True:
-        v, c = 2 * v, 2 * c + randint(0, 1)
-        if v >= n:
-            if c < n:
-                return c
-            else:
-                v -= n
-                c -= n
+        k = draw(bits)
+        if k < n:
+            return k
+
+
+def _random_indices(n: int, count: int, source):
+    """
+    count independent uniformly random integers below n (as a NumPy array
+    when source is a numpy.random.Generator and they fit in 64 bits).
+    """
+    if n <= 0:
+        raise IndexError("Cannot choose from an empty pseudo-list.")
+    if hasattr(source, "integers") and n - 1 <= _INT64_MAX:
+        return source.integers(n - 1, endpoint=True, size=count)
+    return [_random_below(n, source) for _ in range(count)]
+
+
+def _distinct_indices(n: int, source) -> Iterator[int]:
+    """
+    Distinct random indices below n (all of them, eventually), by a
+    sparse Fisher-Yates shuffle: only displaced indices are stored.
+    """
+    displaced = dict[int, int]()
+    for i in range(n):
+        j = i + _random_below(n - i, source)
+        yield displaced.get(j, j)
+        displaced[j] = displaced.pop(i, i)
 
 
 class Combinatoric:
@@ -25,6 +84,15 @@ class Combinatoric:
     _r: int
     _items: list | str
     _length: int
+    _item_positions: dict | None
+    _output: str = "items"
+    _outputs: tuple[str, ...] = ("items", "positions")
+    _order: str = "lexicographic"
+    _orders: tuple[str, ...] = ("lexicographic",)
+    _constraints: tuple[list[int], list[int], list[int]] | None = None
+    _constraint_arguments: dict = {}
+    _batched: bool = True
+    _fixed_length: bool = True
 
     def __init__(self):
         raise NotImplementedError()
@@ -33,21 +101,383 @@ class Combinatoric:
         return self._length
 
     def __iter__(self):
-        return (self[i] for i in range(self._length))
+        return self._iterate(0)
+
+    def __reversed__(self):
+        if self._length == 0:
+            return iter(())
+        return map(self._converter(), self._positions_before(self._length - 1))
 
     def __getitem__(self, k: int | slice) -> list | str:
+        if isinstance(k, slice):
+            return self._slice(k)
+        else:
+            return self._converter()(self._positions(_adjusted_index(k, self._length)))
+
+    def __contains__(self, arrangement: list | str) -> bool:
+        return self._member_positions(arrangement) is not None
+
+    def random(self, seed=None) -> list | str:
+        """
+        A random combinatoric. (seed may be an int, a random.Random or a
+        numpy.random.Generator; by default, the random module is used.)
+        """
+        return self[_random_below(self._length, _random_source(seed))]
+
+    def randoms(self, count: int, seed=None) -> list:
+        """
+        count (independent) random combinatorics. (See random for seed;
+        with NumPy, these are unranked in a batch.)
+        """
+        indices = _random_indices(self._length, count, _random_source(seed))
+        if np is None or self._length - 1 > _INT64_MAX or not self._batched:
+            return [self[k] for k in indices]
+        convert = self._converter()
+        return [
+            convert(_unpadded(positions))
+            for positions in self.unrank_many(indices).tolist()
+        ]
+
+    def sample(self, k: int, seed=None) -> list:
+        """k distinct random combinatorics. (See random for seed.)"""
+        if not 0 <= k <= self._length:
+            raise ValueError("Sample larger than pseudo-list or is negative.")
+        return list(islice(self.samples(seed), k))
+
+    def samples(self, seed=None) -> Iterator[list | str]:
+        """
+        Distinct random combinatorics, until the pseudo-list is exhausted.
+        (See random for seed.)
+        """
+        return (
+            self[k] for k in _distinct_indices(self._length, _random_source(seed))
+        )
+
+    def index(self, arrangement: list | str) -> int:
+        positions = self._member_positions(arrangement)
+        return -1 if positions is None else self._index(positions)
+
+    def iter_deltas(self) -> Iterator[tuple]:
+        """
+        The changes from each arrangement to the next, for pseudo-lists in
+        a minimal-change order. First comes ("reset", arrangement), with
+        the first arrangement, and then for each step one of:
+
+        ("swap", i, j): the elements in slots i and j change places
+        (Permutations and Compounds; where the combination of items
+        changes, a new ("reset", arrangement) comes instead);
+        ("add", x) or ("remove", x): x joins or leaves (Subsets in "gray"
+        order);
+        ("exchange", x, y): x leaves and y joins (Combinations in
+        "revolving_door" order);
+        ("set", i, x, y): slot i changes from x to y (Amalgams in "gray"
+        order).
+
+        Elements x and y are items (or positions, in other output modes).
+        """
+        if self._length == 0:
+            return iter(())
+        return _converted_deltas(self, self._deltas_from(0))
+
+    def cursor(
+        self,
+        start: int | dict | str = 0,
+        checkpoint: Callable | None = None,
+        every: int | None = None,
+        seconds: float | None = None,
+    ):
+        """
+        A resumable iterator over the arrangements from start (an index or
+        a state saved from another cursor), with an optional checkpoint
+        callback every `every` arrangements or `seconds` seconds. (See
+        Cursor.)
+        """
+        from .cursor import Cursor
+
+        return Cursor(self, start, checkpoint, every, seconds)
+
+    def shards(self, n: int) -> list["Combinatoric"]:
+        """
+        The pseudo-list split into n consecutive views (as equal in length
+        as possible), for distributing work.
+        """
+        size, extra = divmod(self._length, n)
+        starts = [i * size + min(i, extra) for i in range(n + 1)]
+        return [self[starts[i] : starts[i + 1]] for i in range(n)]
+
+    def parallel_map(
+        self,
+        func: Callable,
+        workers: int | None = None,
+        chunksize: int | None = None,
+        ordered: bool = True,
+    ) -> Iterator:
+        """
+        func of each arrangement, computed in chunks of chunksize on a pool
+        of worker processes. (func must be picklable. Results come in
+        order unless ordered is False; abandoning the iterator cancels
+        outstanding chunks.)
+        """
+        return _parallel_map(self, func, workers, chunksize, ordered)
+
+    def parallel_reduce(
+        self,
+        func: Callable,
+        reducer: Callable,
+        initial: Any,
+        workers: int | None = None,
+        chunksize: int | None = None,
+    ) -> Any:
+        """
+        reducer folded, from initial, over func of each arrangement, with
+        chunks of chunksize reduced on a pool of worker processes. (func and
+        reducer must be picklable.)
+        """
+        return _parallel_reduce(self, func, reducer, initial, workers, chunksize)
+
+    def unrank_positions(self, k: int) -> tuple[int, ...]:
+        """The positions in items of the elements of the kth arrangement."""
+        return tuple(self._positions(_adjusted_index(k, self._length)))
+
+    def unrank_many(self, indices):
+        """
+        The positions in items of the elements of the arrangements at each
+        of indices, as a 2-D NumPy array with one row per index. (Requires
+        NumPy; rows of variable-length arrangements are padded with -1.)
+        """
+        self._check_batched()
+        return self._positions_many(_indices(indices, self._length))
+
+    def index_many(self, arrangements):
+        """
+        The indices of each of arrangements, as a NumPy array (with -1 for
+        any arrangement not in the pseudo-list). Arrangements may also be
+        given as a 2-D NumPy array of positions in items, as returned by
+        unrank_many. (Requires NumPy.)
+        """
+        self._check_batched()
+        return self._indices_many(
+            _positions_array(arrangements, self._member_positions, self._row_width())
+        )
+
+    def fill_positions(
+        self, buffer, start: int = 0, count: int | None = None, offsets=None
+    ) -> int:
+        """
+        Write the positions in items of the elements of the arrangements
+        from start on (count of them, or as many as there is room for) into
+        buffer, any writable buffer of integers (such as an array.array or
+        a C-contiguous NumPy array of shape (count, r)), one row after
+        another, stepping with the successor function. Returns the number
+        of arrangements written.
+
+        Arrangements that vary in length (Subsets, Compounds) need
+        offsets, a second buffer of integers: they are written one after
+        another in buffer, and offsets receives 0 and the end of each in
+        buffer (as for Arrow list arrays).
+        """
+        from .fill import _fill_positions
+
+        return _fill_positions(self, buffer, start, count, offsets)
+
+    def _check_batched(self) -> None:
+        """Raise TypeError if arrangements are not made of positions in items."""
+        if not self._batched:
+            raise TypeError(
+                "{} does not have positions in items.".format(type(self).__name__)
+            )
+
+    def _row_width(self) -> int:
+        """The number of columns in a row of positions."""
+        return self._r
+
+    def _positions(self, k: int) -> list[int]:
+        """Item positions of the kth arrangement."""
         raise NotImplementedError()
 
-    def __contains__(self, arrangement: list) -> bool:
+    def _index(self, positions: list[int]) -> int:
+        """The index of the arrangement at item positions."""
         raise NotImplementedError()
 
-    def random(self) -> list | str:
-        """A random combinatoric."""
-        return self[_fast_dice_roller(self._length)]
+    def _set_output(self, output: str) -> None:
+        """Use output mode output, if this pseudo-list supports it."""
+        if output not in self._outputs:
+            raise ValueError(
+                "Output mode {!r} is not one of {}.".format(
+                    output, ", ".join(map(repr, self._outputs))
+                )
+            )
+        self._output = output
+
+    def _set_order(self, order: str) -> None:
+        """Use order, if this pseudo-list supports it."""
+        if order not in self._orders:
+            raise ValueError(
+                "Order {!r} is not one of {}.".format(
+                    order, ", ".join(map(repr, self._orders))
+                )
+            )
+        self._order = order
+
+    def _set_constraints(
+        self, required=None, forbidden=None, min_size=None, max_size=None
+    ) -> None:
+        """
+        Keep only arrangements including every required item and no
+        forbidden one (and, where lengths vary, of min_size to max_size
+        items), if any constraint is given (see _constraints).
+        """
+        arguments = {
+            "min_size": min_size,
+            "max_size": max_size,
+            "required": required,
+            "forbidden": forbidden,
+        }
+        self._constraint_arguments = {
+            name: value for name, value in arguments.items() if value is not None
+        }
+        if not self._constraint_arguments:
+            return
+        if self._order != self._orders[0]:
+            raise ValueError(
+                "Only pseudo-lists in {} order can be constrained.".format(
+                    self._orders[0]
+                )
+            )
+        self._constraints = _constraints(
+            self._items, self._item_positions, required or [], forbidden or []
+        )
+
+    def _converter(self) -> Callable[[list[int]], Any]:
+        """A function giving an arrangement, in the output mode, from positions."""
+        if self._output == "items":
+            return partial(_positioned_arrangement, self._items)
+        elif self._output == "positions":
+            return tuple
+        elif self._output == "bitmask":
+            return _subset_index
+        else:
+            return self._index
+
+    def _lookup(self, arrangement) -> list[int] | None:
+        """
+        Item positions of the elements of arrangement, given in the output
+        mode (None if any is missing).
+        """
+        n = len(self._items)
+        if self._output == "items":
+            return _positions_of(arrangement, self._items, self._item_positions)
+        elif self._output == "positions":
+            positions = list(arrangement)
+            if all(isinstance(p, int) and 0 <= p < n for p in positions):
+                return positions
+        elif isinstance(arrangement, int):
+            if self._output == "bitmask" and 0 <= arrangement < 1 << n:
+                return _subset_positions(arrangement, n)
+            if self._output == "index" and 0 <= arrangement < self._length:
+                return self._positions(arrangement)
+        return None
+
+    def _member_positions(self, arrangement: list | str) -> list[int] | None:
+        """Item positions of arrangement (None if it is not in the pseudo-list)."""
+        raise NotImplementedError()
+
+    def _allowed(self, positions: list[int] | None) -> list[int] | None:
+        """Positions, if they are those of an arrangement in the pseudo-list."""
+        raise NotImplementedError()
+
+    def _row_index(self, row: list[int]) -> int:
+        """
+        The index of the arrangement at a row of positions padded with -1
+        (-1 if it is not in the pseudo-list), for batches the NumPy
+        kernels do not cover.
+        """
+        row = _unpadded(row)
+        if not all(0 <= position < len(self._items) for position in row):
+            return -1
+        positions = self._allowed(row)
+        return -1 if positions is None else self._index(positions)
+
+    def _positions_many(self, indices):
+        """Item positions of the arrangements at (a NumPy array of) indices."""
+        raise NotImplementedError()
+
+    def _indices_many(self, positions):
+        """Indices of the arrangements at (a NumPy array of) positions."""
+        raise NotImplementedError()
+
+    def _positions_from(self, k: int) -> Iterator[list[int]]:
+        """
+        Item positions of the kth arrangement and each of its successors.
+        (Subclasses step with a successor function rather than unranking
+        each index; the same list may be yielded each time.)
+        """
+        raise NotImplementedError()
 
-    def index(self, arrangement: list) -> int:
+    def _positions_before(self, k: int) -> Iterator[list[int]]:
+        """
+        Item positions of the kth arrangement and each of its predecessors.
+        (Subclasses step with a predecessor function; the same list may be
+        yielded each time.)
+        """
         raise NotImplementedError()
 
+    def _deltas_from(self, k: int) -> Iterator[tuple]:
+        """
+        The changes (in item positions) from the kth arrangement on (see
+        iter_deltas).
+        """
+        raise ValueError(
+            "{} does not change by single steps in {} order.".format(
+                type(self).__name__, self._order
+            )
+        )
+
+    def _arrangements_from(self, k: int) -> Iterator:
+        """
+        The kth arrangement and each of its successors, in the output mode.
+        (Where the order matches an itertools generator, it is used in the
+        items and positions modes.)
+        """
+        if self._output in ("items", "positions"):
+            tuples = self._tuples_from(k, self._pool())
+            if tuples is not None:
+                return self._from_tuples(tuples)
+        return map(self._converter(), self._positions_from(k))
+
+    def _tuples_from(self, k: int, pool) -> Iterator[tuple] | None:
+        """
+        Tuples of the elements of pool (items or their positions) in the
+        kth arrangement and each of its successors, from an itertools
+        generator, or None if the order does not match one.
+        """
+        return None
+
+    def _pool(self) -> list | str | range:
+        """
+        What itertools arranges: the items, or for positions output, their
+        positions.
+        """
+        return range(len(self._items)) if self._output == "positions" else self._items
+
+    def _from_tuples(self, tuples: Iterator) -> Iterator:
+        """
+        Arrangements in the items or positions mode from tuples (or other
+        iterables) taken from the pool.
+        """
+        if self._output == "positions":
+            return map(tuple, tuples)
+        return map("".join if isinstance(self._items, str) else list, tuples)
+
+    def _iterate(self, start: int, stop: int | None = None) -> Iterator[list | str]:
+        """Arrangements start, start + 1, ..., stop - 1 (or to the end)."""
+        if start >= (self._length if stop is None else stop):
+            return iter(())
+        arrangements = self._arrangements_from(start)
+        if stop is not None:
+            arrangements = _take(arrangements, stop - start)
+        return arrangements
+
     def _str(self, name: str) -> str:
         return _string(self, name)
 
@@ -55,13 +485,40 @@ class Combinatoric:
         return _representation(self, name)
 
     def _slice(self, s: slice):
-        start = 0 if s.start == None else _adjusted_index(s.start, self._length)
-        stop = self._length if s.stop == None else _adjusted_index(s.stop, self._length)
-        step = 1 if s.step == None else s.step
+        from .view import View
 
-        return [
-            self[_adjusted_index(i, self._length)] for i in range(start, stop, step)
-        ]
+        return View(self, range(self._length)[s])
+
+
+def _converted_deltas(combinatoric: Combinatoric, deltas: Iterator[tuple]):
+    """deltas (in item positions) in the output mode of the Combinatoric."""
+    convert = combinatoric._converter()
+    items = combinatoric._items
+    for delta in deltas:
+        kind = delta[0]
+        if kind == "reset":
+            yield ("reset", convert(delta[1]))
+        elif kind == "swap":
+            yield delta
+        elif combinatoric._output != "items":
+            yield delta
+        elif kind == "set":
+            yield ("set", delta[1], items[delta[2]], items[delta[3]])
+        else:
+            yield (kind, *[items[p] for p in delta[1:]])
+
+
+def _unpadded(positions: list[int]) -> list[int]:
+    """positions without any -1 padding."""
+    return positions[: positions.index(-1)] if -1 in positions else positions
+
+
+def _take(iterable, count: int):
+    """The first count elements of iterable (count may exceed sys.maxsize)."""
+    while count > 0:
+        chunk = min(count, 1 << 62)
+        yield from islice(iterable, chunk)
+        count -= chunk
 
 
 def _string(combinatoric: Combinatoric, name: str) -> str:
@@ -81,8 +538,26 @@ def _representation(combinatoric: Combinatoric, name: str) -> str:
         combinatoric._items,
         combinatoric._items,
     )
-    return "{}({}, {})".format(
+    return "{}({}, {}{})".format(
         name,
         combinatoric._r,
         f"'{arrangement}'" if isinstance(arrangement, str) else arrangement,
+        _output_argument(combinatoric),
+    )
+
+
+def _output_argument(combinatoric: Combinatoric) -> str:
+    """
+    The output (and order and constraint) arguments in a representation
+    of the Combinatoric (if needed).
+    """
+    output = combinatoric._output
+    order = combinatoric._order
+    return "{}{}{}".format(
+        "" if output == "items" else f", output='{output}'",
+        "" if order == combinatoric._orders[0] else f", order='{order}'",
+        "".join(
+            f", {name}={value!r}"
+            for name, value in combinatoric._constraint_arguments.items()
+        ),
     )
@@ -1,13 +1,18 @@
+from typing import Iterator
+
+from .batch import _composition_positions_many, _composition_indices_many
 from .helpers import (
-    _adjusted_index,
-    _arrangement,
-    _items_exist_in_universal,
-    _n_c_r,
-    _composition,
-    _inverse_composition,
+    _checked_positions,
+    _item_positions,
+    _composition_positions,
+    _composition_index,
+    _compositions_from,
+    _compositions_before,
+    _composition_tuples,
 )
 
 from .combinatoric import Combinatoric
+from .counting import _compositions_count
 
 
 class Compositions(Combinatoric):
@@ -17,21 +22,32 @@ class Compositions(Combinatoric):
     repetition is allowed.
     """
 
-    def __init__(self, r: int, items: list | str):
+    def __init__(self, r: int, items: list | str, output: str = "items"):
         self._r = r
         self._items = items
-        self._length = _n_c_r(len(items) + r - 1, r)
-
-    def __getitem__(self, k: int | slice) -> list | str:
-        if isinstance(k, slice):
-            return super()._slice(k)
-        else:
-            dummy = _composition(
-                _adjusted_index(k, self._length),
-                self._r,
-                self._items,
-            )
-            return _arrangement(self._items, dummy)
+        self._item_positions = _item_positions(items)
+        self._set_output(output)
+        self._length = _compositions_count(len(items), r)
+
+    def _positions(self, k: int) -> list[int]:
+        return _composition_positions(k, self._r, len(self._items))
+
+    def _positions_many(self, indices):
+        return _composition_positions_many(indices, self._r, len(self._items))
+
+    def _indices_many(self, positions):
+        return _composition_indices_many(
+            positions, self._r, len(self._items), self._length
+        )
+
+    def _positions_from(self, k: int) -> Iterator[list[int]]:
+        return _compositions_from(k, self._r, len(self._items))
+
+    def _positions_before(self, k: int) -> Iterator[list[int]]:
+        return _compositions_before(k, self._r, len(self._items))
+
+    def _tuples_from(self, k: int, pool) -> Iterator[tuple] | None:
+        return _composition_tuples(k, self._r, pool)
 
     def __repr__(self):
         return super()._repr("Compositions")
@@ -39,8 +55,8 @@ class Compositions(Combinatoric):
     def __str__(self):
         return super()._str("compositions")
 
-    def __contains__(self, selection: list) -> bool:
-        return _items_exist_in_universal(selection, self._items)
+    def _member_positions(self, arrangement: list | str) -> list[int] | None:
+        return _checked_positions(self._lookup(arrangement), self._r, unique=False)
 
-    def index(self, selection: list) -> int:
-        return _inverse_composition(selection, self._items) if selection in self else -1
+    def _index(self, positions: list[int]) -> int:
+        return _composition_index(sorted(positions), len(self._items))
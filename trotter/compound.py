@@ -1,39 +1,114 @@
+from functools import cached_property
+from typing import Iterator
+
+from .batch import (
+    _indices_by_row,
+    _positions_by_row,
+    _compound_positions_many,
+    _compound_indices_many,
+)
 from .helpers import (
-    _adjusted_index,
+    _checked_positions,
+    _item_positions,
     _arrangement,
-    _items_exist_in_universal,
-    _items_are_unique,
-    _n_p_r,
-    _compound,
-    _inverse_compound,
+    _compound_positions,
+    _compound_index,
+    _compounds_from,
+    _compounds_before,
+    _free_slots,
+    _constrained_compound_positions,
+    _constrained_compound_index,
+    _constrained_compounds_from,
+    _constrained_compounds_before,
 )
 
-from .combinatoric import Combinatoric
+from .combinatoric import Combinatoric, _output_argument
+from .counting import (
+    _compound_offsets,
+    _compounds_count,
+    _constrained_compound_offsets,
+)
 
 
 class Compounds(Combinatoric):
     """A pseudo-list containing compounds of items.
 
     A compound is an arrangement in which order is important,
-    repetition is not allowed, and length is not specified.
+    repetition is not allowed, and length is not specified. Compounds may
+    be constrained to have min_size to max_size items, and to include
+    every one of the required items and none of the forbidden items;
+    only those are counted and indexed.
     """
 
-    def __init__(self, items: list | str):
+    _fixed_length = False
+
+    def __init__(
+        self,
+        items: list | str,
+        output: str = "items",
+        min_size: int | None = None,
+        max_size: int | None = None,
+        required: list | str | None = None,
+        forbidden: list | str | None = None,
+    ):
         n = len(items)
         self._items = items
-        self._length = sum([_n_p_r(n, r) for r in range(n + 1)])
-
-    def __getitem__(self, k: int | slice) -> list | str:
-        if isinstance(k, slice):
-            return super()._slice(k)
+        self._item_positions = _item_positions(items)
+        self._set_output(output)
+        self._set_constraints(required, forbidden, min_size, max_size)
+        if self._constraints is None:
+            self._length = _compounds_count(n)
         else:
-            dummy = _compound(_adjusted_index(k, self._length), self._items)
-            return _arrangement(self._items, dummy)
+            self._sizes = (min_size or 0, n if max_size is None else max_size)
+            self._length = self._offsets[-1]
+
+    @cached_property
+    def _offsets(self) -> list[int]:
+        if self._constraints is None:
+            return _compound_offsets(len(self._items))
+        required, free, _ = self._constraints
+        return _constrained_compound_offsets(len(free), len(required), *self._sizes)
+
+    def _positions(self, k: int) -> list[int]:
+        if self._constraints is not None:
+            return _constrained_compound_positions(k, self._offsets, self._constraints)
+        return _compound_positions(k, self._offsets)
+
+    def _positions_many(self, indices):
+        if self._constraints is not None:
+            return _positions_by_row(indices, self._positions, len(self._items))
+        return _compound_positions_many(indices, self._offsets)
+
+    def _row_width(self) -> int:
+        return len(self._items)
+
+    def _indices_many(self, positions):
+        if self._constraints is not None:
+            return _indices_by_row(positions, self._row_index, self._length)
+        return _compound_indices_many(positions, self._offsets)
+
+    def _positions_from(self, k: int) -> Iterator[list[int]]:
+        if self._constraints is not None:
+            return _constrained_compounds_from(k, self._offsets, self._constraints)
+        return _compounds_from(k, self._offsets)
+
+    def _positions_before(self, k: int) -> Iterator[list[int]]:
+        if self._constraints is not None:
+            return _constrained_compounds_before(k, self._offsets, self._constraints)
+        return _compounds_before(k, self._offsets)
+
+    def _deltas_from(self, k: int) -> Iterator[tuple]:
+        if self._constraints is not None:
+            return _constrained_compounds_from(
+                k, self._offsets, self._constraints, deltas=True
+            )
+        return _compounds_from(k, self._offsets, deltas=True)
 
     def __repr__(self):
         arrangement = _arrangement(self._items, self._items)
-        return "Compounds({})".format(
-            f'"{arrangement}"' if isinstance(arrangement, str) else arrangement
+        return "Compounds({}{})".format(
+            f'"{arrangement}"' if isinstance(arrangement, str) else arrangement,
+            _output_argument(self),
         )
 
     def __str__(self):
@@ -43,10 +118,20 @@ class Compounds(Combinatoric):
             '"{}"'.format(arrangement) if isinstance(arrangement, str) else arrangement,
         )
 
-    def __contains__(self, compound: list) -> bool:
-        return _items_exist_in_universal(compound, self._items) and _items_are_unique(
-            compound
-        )
+    def _member_positions(self, arrangement: list | str) -> list[int] | None:
+        return self._allowed(self._lookup(arrangement))
+
+    def _allowed(self, positions: list[int] | None) -> list[int] | None:
+        positions = _checked_positions(positions, None, unique=True)
+        if positions is None or self._constraints is None:
+            return positions
+        if not self._sizes[0] <= len(positions) <= self._sizes[1]:
+            return None
+        return None if _free_slots(positions, self._constraints) is None else positions
 
-    def index(self, compound: list) -> int:
-        return _inverse_compound(compound, self._items) if compound in self else -1
+    def _index(self, positions: list[int]) -> int:
+        if self._constraints is not None:
+            return _constrained_compound_index(
+                positions, self._offsets, self._constraints
+            )
+        return _compound_index(positions, self._offsets)
@@ -0,0 +1,100 @@
+from bisect import bisect_right
+from functools import partial
+from itertools import chain, repeat
+from typing import Callable, Iterator
+
+from .combinatoric import Combinatoric
+
+
+def _converted_part(converters: list[Callable], part: tuple) -> list | str:
+    """The arrangement of part, (j, item positions in the jth pseudo-list)."""
+    j, positions = part
+    return converters[j](positions)
+
+
+class Concat(Combinatoric):
+    """A pseudo-list containing the arrangements of several pseudo-lists,
+    one after the other.
+
+    The kth arrangement is found in the pseudo-list whose first index is
+    the last at or before k (by bisection of the first indices).
+    """
+
+    _items = None
+    _item_positions = None
+    _batched = False
+
+    def __init__(self, *combinatorics: Combinatoric):
+        self._combinatorics = combinatorics
+        self._offsets = [0]
+        for combinatoric in combinatorics:
+            self._offsets.append(self._offsets[-1] + combinatoric._length)
+        self._length = self._offsets[-1]
+
+    def _part(self, k: int) -> int:
+        """The index of the pseudo-list holding the kth arrangement."""
+        return bisect_right(self._offsets, k) - 1
+
+    def _converter(self):
+        return partial(
+            _converted_part, [c._converter() for c in self._combinatorics]
+        )
+
+    def _positions(self, k: int) -> tuple:
+        j = self._part(k)
+        return j, self._combinatorics[j]._positions(k - self._offsets[j])
+
+    def _starts(self, k: int, forward: bool) -> Iterator[tuple[int, int]]:
+        """
+        (j, index) for each (non-empty) pseudo-list walked over from the
+        kth arrangement forward (or back), with the index in the jth
+        pseudo-list that its walk starts from.
+        """
+        j = self._part(k)
+        yield j, k - self._offsets[j]
+        if forward:
+            later = range(j + 1, len(self._combinatorics))
+        else:
+            later = range(j - 1, -1, -1)
+        for i in later:
+            length = self._combinatorics[i]._length
+            if length:
+                yield i, 0 if forward else length - 1
+
+    def _positions_from(self, k: int) -> Iterator[tuple]:
+        return chain.from_iterable(
+            zip(repeat(j), self._combinatorics[j]._positions_from(start))
+            for j, start in self._starts(k, forward=True)
+        )
+
+    def _positions_before(self, k: int) -> Iterator[tuple]:
+        return chain.from_iterable(
+            zip(repeat(j), self._combinatorics[j]._positions_before(start))
+            for j, start in self._starts(k, forward=False)
+        )
+
+    def _arrangements_from(self, k: int) -> Iterator:
+        return chain.from_iterable(
+            self._combinatorics[j]._arrangements_from(start)
+            for j, start in self._starts(k, forward=True)
+        )
+
+    def __repr__(self):
+        return "Concat({})".format(", ".join(map(repr, self._combinatorics)))
+
+    def __str__(self):
+        return "A pseudo-list containing {} arrangements from {} in turn.".format(
+            self._length,
+            ", ".join(map(repr, self._combinatorics)),
+        )
+
+    def _member_positions(self, arrangement: list | str) -> tuple | None:
+        for j, combinatoric in enumerate(self._combinatorics):
+            positions = combinatoric._member_positions(arrangement)
+            if positions is not None:
+                return j, positions
+        return None
+
+    def _index(self, positions: tuple) -> int:
+        j, positions = positions
+        return self._offsets[j] + self._combinatorics[j]._index(positions)
@@ -0,0 +1,145 @@
+from functools import lru_cache
+from math import comb, factorial, perm
+
+
+def _fact(n: int) -> int:
+    """n!"""
+    return factorial(n)
+
+
+def _n_p_r(n: int, r: int) -> int:
+    """Permutations count of r items taken from n."""
+    return perm(n, r)
+
+
+def _n_c_r(n: int, r: int) -> int:
+    """Combinations count of r items taken from n."""
+    return comb(n, r)
+
+
+@lru_cache(maxsize=64)
+def _binomials(r: int, n: int) -> tuple[int, ...]:
+    """
+    Combinations counts of r items taken from each of 0, 1, ..., n - 1,
+    built multiplicatively. (A bounded number of these rows are cached.)
+    """
+    row = [0] * n
+    if r < n:
+        d = 1
+        row[r] = d
+        for m in range(r + 1, n):
+            d = d * m // (m - r)
+            row[m] = d
+    return tuple(row)
+
+
+def _compositions_count(n: int, r: int) -> int:
+    """Compositions count of r items taken from n."""
+    return comb(n + r - 1, r) if r > 0 else 1
+
+
+def _compounds_count(n: int) -> int:
+    """Compounds count of n items: the sum of n!/(n - r)! for r = 0, ..., n."""
+    count = 1
+    for m in range(1, n + 1):
+        count = m * count + 1
+    return count
+
+
+def _compound_offsets(n: int) -> list[int]:
+    """
+    The index of the first compound of n items of each length 0, ..., n,
+    followed by the compounds count.
+    """
+    offsets = [0]
+    group_size = 1
+    for r in range(n + 1):
+        offsets.append(offsets[-1] + group_size)
+        group_size *= n - r
+    return offsets
+
+
+def _subsets_count(n: int) -> int:
+    """Subsets count of n items."""
+    return 1 << n
+
+
+def _sized_subsets_count(n: int, a: int, b: int) -> int:
+    """Subsets count of n items, of a to b items."""
+    if a <= 0 and b >= n:
+        return 1 << n
+    return _binomial_prefix(n, b)[0] - _binomial_prefix(n, a - 1)[0]
+
+
+def _binomial_prefix(n: int, m: int) -> tuple[int, int]:
+    """The sum of C(n, s) for s up to m, and C(n, m)."""
+    if m < 0:
+        return 0, 0
+    if m >= n:
+        return 1 << n, int(m == n)
+    if 2 * m > n:
+        # By symmetry, the sum is 2**n less the sum up to n - m - 1.
+        total, d = _binomial_prefix(n, n - m - 1)
+        return (1 << n) - total, d * (m + 1) // (n - m)
+    d = 1
+    total = 1
+    for s in range(m):
+        d = d * (n - s) // (s + 1)
+        total += d
+    return total, d
+
+
+def _constrained_compound_offsets(n: int, q: int, lo: int, hi: int) -> list[int]:
+    """
+    The index of the first compound of each length 0, ..., n + q,
+    followed by the compounds count, for compounds of lo to hi items that
+    include q required items and any of n others: there are C(n, r - q)
+    combinations of each length r, each with r! orders.
+    """
+    offsets = [0]
+    for r in range(n + q + 1):
+        group_size = comb(n, r - q) * factorial(r) if q <= r and lo <= r <= hi else 0
+        offsets.append(offsets[-1] + group_size)
+    return offsets
+
+
+@lru_cache(maxsize=1024)
+def _multiset_permutations_count(counts: tuple[int, ...], r: int) -> int:
+    """
+    Permutations count of r items taken from a multiset with the given
+    multiplicities (pass them sorted, for better caching).
+    """
+    if r == sum(counts):
+        count = factorial(r)
+        for m in counts:
+            count //= factorial(m)
+        return count
+    # ways[l] counts the sequences of length l from the kinds so far; a
+    # further kind, used i times, goes in C(l, i) ways among l slots.
+    ways = [1] + [0] * r
+    for m in counts:
+        ways = [
+            sum(ways[l - i] * comb(l, i) for i in range(min(m, l) + 1))
+            for l in range(r + 1)
+        ]
+    return ways[r]
+
+
+def _multiset_combinations_table(counts: list[int], r: int) -> list[list[int]]:
+    """
+    Combinations counts from a multiset with the given multiplicities:
+    table[j][l] counts those of l items taken from kinds j, j + 1, ....
+    """
+    table = [[1] + [0] * r]
+    for m in reversed(counts):
+        following = table[0]
+        # row[l] sums following[l - x] for x = 0, ..., m (a sliding window).
+        row = []
+        total = 0
+        for l in range(r + 1):
+            total += following[l]
+            if l > m:
+                total -= following[l - m - 1]
+            row.append(total)
+        table.insert(0, row)
+    return table
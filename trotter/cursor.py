@@ -0,0 +1,103 @@
+import json
+from time import monotonic
+from typing import Callable, Iterator
+
+from .combinatoric import Combinatoric
+
+
+class Cursor:
+    """A resumable iterator over a pseudo-list.
+
+    Arrangements are stepped to by the pseudo-list's successor function.
+    index is the index of the next arrangement, so once every
+    arrangement taken has been dealt with, state() (or to_json()) can be
+    saved and later passed as start to cursor, which finds the
+    arrangement at index directly and carries on from there. Cursors can
+    also be pickled.
+
+    If checkpoint is given, it is called with the cursor every `every`
+    arrangements and/or every `seconds` seconds, when the next
+    arrangement is asked for (and once more at the end), to save it.
+    """
+
+    def __init__(
+        self,
+        combinatoric: Combinatoric,
+        start: int | dict | str = 0,
+        checkpoint: Callable[["Cursor"], None] | None = None,
+        every: int | None = None,
+        seconds: float | None = None,
+    ):
+        if isinstance(start, str):
+            start = json.loads(start)
+        if isinstance(start, dict):
+            if int(start["length"]) != combinatoric._length:
+                raise ValueError(
+                    "State is for a pseudo-list of {} arrangements, not {}.".format(
+                        start["length"], combinatoric._length
+                    )
+                )
+            start = int(start["index"])
+        if not 0 <= start <= combinatoric._length:
+            raise ValueError("Start outside pseudo-list.")
+        self._combinatoric = combinatoric
+        self.index = start
+        self._checkpoint = checkpoint
+        self._every = every
+        self._seconds = seconds
+        self._arrangements = None
+        self._taken = 0
+        self._saved = monotonic()
+
+    def __iter__(self) -> Iterator:
+        return self
+
+    def __next__(self):
+        if self._checkpoint is not None and self._due():
+            self._save()
+        if self.index >= self._combinatoric._length:
+            if self._checkpoint is not None and self._taken:
+                self._save()
+            raise StopIteration
+        if self._arrangements is None:
+            self._arrangements = self._combinatoric._arrangements_from(self.index)
+        arrangement = next(self._arrangements)
+        self.index += 1
+        self._taken += 1
+        return arrangement
+
+    def _due(self) -> bool:
+        """Whether a checkpoint is due."""
+        if self._every is not None and self._taken >= self._every:
+            return True
+        return (
+            self._seconds is not None
+            and self._taken > 0
+            and monotonic() - self._saved >= self._seconds
+        )
+
+    def _save(self) -> None:
+        """Call the checkpoint and start counting again."""
+        self._checkpoint(self)
+        self._taken = 0
+        self._saved = monotonic()
+
+    def state(self) -> dict:
+        """
+        The state of the cursor: the index of the next arrangement and the
+        length of the pseudo-list (as strings, since they may be too large
+        for JSON numbers).
+        """
+        return {"index": str(self.index), "length": str(self._combinatoric._length)}
+
+    def to_json(self) -> str:
+        """The state of the cursor, as JSON."""
+        return json.dumps(self.state())
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_arrangements"] = None
+        return state
+
+    def __repr__(self):
+        return "{}.cursor({})".format(repr(self._combinatoric), self.index)
@@ -0,0 +1,94 @@
+from array import array
+from collections import deque
+from itertools import islice
+
+_INTEGER_FORMATS = "bBhHiIlLqQ"
+
+# Positions are gathered into blocks of this many before being copied into
+# the buffer.
+_BLOCK = 1 << 16
+
+
+def _integers(buffer) -> memoryview:
+    """A flat, writable memoryview of the integers in buffer."""
+    view = memoryview(buffer)
+    if view.readonly:
+        raise TypeError("Buffer is not writable.")
+    format = view.format.lstrip("@")
+    if format not in _INTEGER_FORMATS:
+        raise TypeError("Buffer must hold integers.")
+    return view.cast("B").cast(format)
+
+
+def _copy(view: memoryview, start: int, block: array) -> int:
+    """Copy block into view from start on, empty it and give the new start."""
+    stop = start + len(block)
+    view[start:stop] = block
+    del block[:]
+    return stop
+
+
+def _fill_positions(combinatoric, buffer, start: int, count: int | None, offsets) -> int:
+    """
+    Write the positions of the arrangements of combinatoric from start on
+    into buffer (see Combinatoric.fill_positions), giving the number of
+    arrangements written.
+    """
+    combinatoric._check_batched()
+    length = combinatoric._length
+    if not 0 <= start <= length:
+        raise ValueError("Start outside pseudo-list.")
+    if offsets is None and not combinatoric._fixed_length:
+        raise ValueError("Arrangements of varying length need a buffer of offsets.")
+    values = _integers(buffer)
+    rows = length - start if count is None else min(count, length - start)
+    if offsets is None:
+        width = combinatoric._row_width()
+        if width:
+            rows = min(rows, len(values) // width)
+    else:
+        ends = _integers(offsets)
+        rows = min(rows, len(ends) - 1)
+        if rows < 0:
+            raise ValueError("Offsets need room for at least one offset.")
+        ends[0] = 0
+    if rows == 0:
+        return 0
+
+    # Where the order matches an itertools generator, it is quickest to
+    # arrange the positions themselves.
+    walk = combinatoric._tuples_from(start, range(len(combinatoric._items)))
+    if walk is None:
+        walk = combinatoric._positions_from(start)
+    walk = islice(walk, rows)
+    block = array(values.format)
+    if offsets is None:
+        # Rows all have the same width, so whole blocks of them can be
+        # gathered without a Python loop.
+        per_block = max(1, _BLOCK // max(width, 1))
+        filled = 0
+        for taken in range(0, rows, per_block):
+            deque(map(block.extend, islice(walk, per_block)), maxlen=0)
+            filled = _copy(values, filled, block)
+        return rows
+
+    # Each arrangement goes after the last, with its end in offsets, for as
+    # many as there is room for in values.
+    end_block = array(ends.format)
+    written = 0
+    filled = 0
+    ended = 1
+    end = 0
+    for positions in walk:
+        end += len(positions)
+        if end > len(values):
+            break
+        block.extend(positions)
+        end_block.append(end)
+        written += 1
+        if len(block) >= _BLOCK or len(end_block) >= _BLOCK:
+            filled = _copy(values, filled, block)
+            ended = _copy(ends, ended, end_block)
+    _copy(values, filled, block)
+    _copy(ends, ended, end_block)
+    return written
@@ -1,281 +1,1483 @@
-from functools import wraps
-from typing import Callable
+from bisect import bisect_left, bisect_right
+from itertools import chain, combinations, combinations_with_replacement
+from itertools import product, repeat
+from operator import add
+from typing import Callable, Iterator
+from .counting import (
+    _binomial_prefix,
+    _fact,
+    _multiset_permutations_count,
+    _n_c_r,
+    _sized_subsets_count,
+)
 
 
-def _cached(f: Callable[[int], int]) -> Callable[[int], int]:
-    cache = dict[int, int]()
+def _item_positions(items: list | str) -> dict | None:
+    """
+    A map from each item to its (first) position in items, or None if
+    some item is unhashable.
+    """
+    positions = {}
+    try:
+        for position, item in enumerate(items):
+            positions.setdefault(item, position)
+    except TypeError:
+        return None
+    return positions
 
-    @wraps(f)
-    def wrapper(n: int) -> int:
-        if n not in cache:
-            cache[n] = f(n)
-        return cache[n]
 
-    return wrapper
+def _positions_of(
+    arrangement: list | str, items: list | str, item_positions: dict | None
+) -> list[int] | None:
+    """
+    The positions in items of the elements of arrangement, or None if
+    some element is not in items.
+    """
+    if item_positions is None:
+        try:
+            return [items.index(item) for item in arrangement]
+        except ValueError:
+            return None
+    positions = []
+    for item in arrangement:
+        try:
+            positions.append(item_positions[item])
+        except (KeyError, TypeError):
+            return None
+    return positions
 
 
-@_cached
-def _fact(n: int) -> int:
-    """n!"""
-    if n <= 1:
-        return 1
-    return n * _fact(n - 1)
+def _checked_positions(
+    positions: list[int] | None, r: int | None, unique: bool
+) -> list[int] | None:
+    """
+    Positions, if there are r of them (or any number if r is None) and
+    they are unique (if required); otherwise None.
+    """
+    if positions is None:
+        return None
+    if r is not None and len(positions) != r:
+        return None
+    if unique and len(set(positions)) != len(positions):
+        return None
+    return positions
 
 
-def _n_p_r(n: int, r: int) -> int:
-    """Permutations count of r items taken from n."""
-    return _fact(n) // _fact(n - r)
+def _arrangement(items: list | str, arrangement: list | str) -> list | str:
+    """A representation of arrangement based on the type of the items."""
+    return "".join(arrangement) if isinstance(items, str) else arrangement
 
 
-def _n_c_r(n: int, r: int) -> int:
-    """Combinations count of r items taken from n."""
-    return _n_p_r(n, r) // _fact(r)
+def _positioned_arrangement(items: list | str, positions: list[int]) -> list | str:
+    """A representation of the elements at positions in items."""
+    return _arrangement(items, [items[position] for position in positions])
 
 
-def _sorted_arrangement(arrangement: list, items: list | str) -> list:
-    """Elements of arrangement ordered as they appear in items."""
-    return sorted(
-        arrangement,
-        key=lambda item: items.index(item),
-    )
+def _fenwick(n: int) -> list[int]:
+    """A Fenwick tree over n slots, each holding 1."""
+    return [i & -i for i in range(n + 1)]
 
 
-def _items_are_unique(items: list) -> bool:
-    """Whether elements in items are unique."""
-    return len(set(items)) == len(items)
+def _fenwick_add(tree: list[int], slot: int, delta: int) -> None:
+    """Add delta to slot in tree."""
+    i = slot + 1
+    while i < len(tree):
+        tree[i] += delta
+        i += i & -i
 
 
-def _items_exist_in_universal(items: list, universal: list | str) -> bool:
-    """Whether elements in items are in universal."""
-    return all(item in universal for item in items)
+def _fenwick_sum(tree: list[int], slot: int) -> int:
+    """The sum of the slots before slot in tree."""
+    total = 0
+    i = slot
+    while i > 0:
+        total += tree[i]
+        i -= i & -i
+    return total
 
 
-def _arrangement(items: list | str, arrangement: list | str) -> list | str:
-    """A representation of arrangement based on the type of the items."""
-    return "".join(arrangement) if isinstance(items, str) else arrangement
+def _fenwick_select(tree: list[int], rank: int) -> int:
+    """The slot at which the sum in tree (0-1 valued) first exceeds rank."""
+    slot = 0
+    step = 1 << (len(tree) - 1).bit_length()
+    while step:
+        i = slot + step
+        if i < len(tree) and tree[i] <= rank:
+            slot = i
+            rank -= tree[i]
+        step >>= 1
+    return slot
 
 
-def _permutation_worker(k: int, items: list) -> list:
+def _johnson_trotter(k: int, items: list) -> list:
     """The kth Johnson-Trotter permutation of all items."""
     n = len(items)
-    if n <= 1:
-        return items
-    else:
-        group = k // n
-        item = k % n
-        position = n - item - 1 if group % 2 == 0 else item
-        dummy = _permutation_worker(group, items[0 : (n - 1)])
-        dummy.insert(position, items[n - 1])
-        return dummy
+    # Item m sits at offsets[m] among items 0, ..., m; the offsets come
+    # from the mixed-radix digits of k.
+    offsets = [0] * n
+    for m in range(n, 1, -1):
+        k, digit = divmod(k, m)
+        offsets[m - 1] = m - digit - 1 if k % 2 == 0 else digit
+    # Place the items from the last down, each in the slot at its offset
+    # among those still free.
+    permutation = [None] * n
+    free = _fenwick(n)
+    for m in range(n - 1, -1, -1):
+        slot = _fenwick_select(free, offsets[m])
+        permutation[slot] = items[m]
+        _fenwick_add(free, slot, -1)
+    return permutation
 
 
-def _inverse_permutation_worker(permutation: list, items: list) -> int:
+def _johnson_trotter_index(slots: list[int]) -> int:
     """
-    The index of permutation in the Johnson-Trotter list of
-    permutations of elements in items.
+    The index of a permutation in the Johnson-Trotter list of
+    permutations of its items, given the slot each item occupies.
     """
-    if len(permutation) == 1:
-        return 0
-    else:
-        n = len(items)
-        index = permutation.index(items[-1])
-        group = _inverse_permutation_worker(
-            [x for x in permutation if x != items[-1]],
-            items[0:(-1)],
-        )
-        return n * group + (n - index - 1 if group % 2 == 0 else index)
+    # The offset of item m among items 0, ..., m is the number of those
+    # items in slots before it; the offsets are the mixed-radix digits.
+    n = len(slots)
+    k = 0
+    taken = [0] * (n + 1)
+    for m, slot in enumerate(slots):
+        offset = _fenwick_sum(taken, slot)
+        _fenwick_add(taken, slot, 1)
+        if m > 0:
+            k = (m + 1) * k + (m - offset if k % 2 == 0 else offset)
+    return k
 
 
-def _amalgam(k: int, r: int, items: list | str) -> list:
-    """The kth permutation of r items taken from items."""
+def _amalgam_positions(k: int, r: int, n: int) -> list[int]:
+    """Positions of the kth amalgam of r elements taken from n."""
+    positions = [0] * r
+    for i in range(r - 1, -1, -1):
+        k, positions[i] = divmod(k, n)
+    return positions
 
-    def element(i):
-        nonlocal k
-        p = len(items) ** (r - i - 1)
-        index = k // p
-        k %= p
-        return items[index]
 
-    return [element(i) for i in range(r)]
+def _amalgam_index(positions: list[int], n: int) -> int:
+    """The index of the amalgam at positions, taken from n elements."""
+    k = 0
+    for position in positions:
+        k = k * n + position
+    return k
 
 
-def _inverse_amalgam(amalgam: list, items: list | str) -> int:
+def _combination_positions(k: int, r: int, n: int) -> list[int]:
+    """Positions of the kth combination of r elements taken from n."""
+    positions = []
+    if r == 0:
+        return positions
+    # d counts the combinations with position p in slot i, C(m, j) where
+    # m = n - p - 1 and j = r - i - 1; it is stepped along rather than
+    # recomputed as p and i advance.
+    position = 0
+    m = n - 1
+    d = _n_c_r(m, r - 1)
+    for j in range(r - 1, -1, -1):
+        while k >= d:
+            k -= d
+            d = d * (m - j) // m
+            m -= 1
+            position += 1
+        positions.append(position)
+        if j > 0:
+            d = d * j // m
+        m -= 1
+        position += 1
+    return positions
+
+
+def _combination_index(positions: list[int], n: int) -> int:
     """
-    The index of amalgam in the ordered amalgams of
-    elements in items.
+    The index of the combination at (ascending) positions, taken from
+    n elements.
     """
-    r = len(amalgam)
-    n = len(items)
-    powers = [n ** i for i in range(r)]
-    return sum(
-        [
-            items.index(amalgam[position]) * powers[r - position - 1]
-            for position in range(r)
-        ]
+    # The combinations skipped over in slot i, from start up to (but not
+    # including) position p, number C(n - start, j) - C(n - p, j), where
+    # j = r - i.
+    r = len(positions)
+    k = 0
+    start = 0
+    for i, position in enumerate(positions):
+        k += _n_c_r(n - start, r - i) - _n_c_r(n - position, r - i)
+        start = position + 1
+    return k
+
+
+def _permutation_positions(k: int, r: int, n: int) -> list[int]:
+    """Positions of the kth permutation of r elements taken from n."""
+    group, item = divmod(k, _fact(r))
+    return _johnson_trotter(item, _combination_positions(group, r, n))
+
+
+def _permutation_index(positions: list[int], n: int) -> int:
+    """The index of the permutation at positions, taken from n elements."""
+    r = len(positions)
+    slots = sorted(range(r), key=positions.__getitem__)
+    group = _combination_index([positions[slot] for slot in slots], n)
+    return group * _fact(r) + _johnson_trotter_index(slots)
+
+
+def _composition_positions(k: int, r: int, n: int) -> list[int]:
+    """Positions of the kth composition of r elements taken from n."""
+    # Compositions correspond, in order, to combinations of r elements
+    # taken from n + r - 1 (shift the ith position down by i).
+    positions = _combination_positions(k, r, n + r - 1)
+    for i in range(r):
+        positions[i] -= i
+    return positions
+
+
+def _composition_index(positions: list[int], n: int) -> int:
+    """
+    The index of the composition at (ascending) positions, taken from
+    n elements.
+    """
+    r = len(positions)
+    return _combination_index(
+        [position + i for i, position in enumerate(positions)], n + r - 1
     )
 
 
-def _combination(k: int, r: int, items: list | str) -> list:
-    """The kth combination of r elements taken from items."""
-    n = len(items)
-    position = 0
-    d = _n_c_r(n - position - 1, r - 1)
+def _subset_positions(k: int, n: int) -> list[int]:
+    """Positions of the kth subset of n elements."""
+    return [j for j, bit in enumerate(bin(k)[:1:-1]) if bit == "1"]
 
-    while k >= d:
-        k -= d
-        position += 1
-        d = _n_c_r(n - position - 1, r - 1)
 
-    if r == 0:
-        return []
-    else:
-        tail = items[(position + 1) :]
-        dummy = [items[position]]
-        dummy.extend(_combination(k, r - 1, tail))
-        return dummy
+def _subset_index(positions: list[int]) -> int:
+    """The index of the subset at (unique) positions."""
+    k = 0
+    for position in positions:
+        k |= 1 << position
+    return k
+
+
+def _compound_positions(k: int, offsets: list[int]) -> list[int]:
+    """
+    Positions of the kth compound of n elements, where offsets are the
+    indices of the first compound of each length (see _compound_offsets).
+    """
+    r = bisect_right(offsets, k) - 1
+    return _permutation_positions(k - offsets[r], r, len(offsets) - 2)
+
+
+def _compound_index(positions: list[int], offsets: list[int]) -> int:
+    """
+    The index of the compound at positions, where offsets are the indices
+    of the first compound of each length (see _compound_offsets).
+    """
+    return offsets[len(positions)] + _permutation_index(positions, len(offsets) - 2)
+
+
+def _walk(
+    positions: list[int], successor: Callable[..., bool], *args
+) -> Iterator[list[int]]:
+    """
+    Positions, followed by each of its successors in turn. (The same
+    list is yielded each time, updated in place.)
+    """
+    yield positions
+    while successor(positions, *args):
+        yield positions
+
+
+def _next_amalgam(positions: list[int], n: int) -> bool:
+    """Step the positions of an amalgam to its successor, odometer style."""
+    i = len(positions) - 1
+    while i >= 0:
+        if positions[i] < n - 1:
+            positions[i] += 1
+            return True
+        positions[i] = 0
+        i -= 1
+    return False
+
+
+def _amalgams_from(k: int, r: int, n: int) -> Iterator[list[int]]:
+    """Positions of the amalgams of r elements taken from n, from the kth on."""
+    return _walk(_amalgam_positions(k, r, n), _next_amalgam, n)
+
+
+def _previous_amalgam(positions: list[int], n: int) -> bool:
+    """Step the positions of an amalgam to its predecessor, odometer style."""
+    i = len(positions) - 1
+    while i >= 0:
+        if positions[i] > 0:
+            positions[i] -= 1
+            return True
+        positions[i] = n - 1
+        i -= 1
+    return False
+
+
+def _amalgams_before(k: int, r: int, n: int) -> Iterator[list[int]]:
+    """Positions of the amalgams of r elements taken from n, from the kth back."""
+    return _walk(_amalgam_positions(k, r, n), _previous_amalgam, n)
+
+
+def _next_combination(positions: list[int], n: int) -> bool:
+    """Step the positions of a combination to its lexicographic successor."""
+    r = len(positions)
+    i = r - 1
+    while i >= 0 and positions[i] == n - r + i:
+        i -= 1
+    if i < 0:
+        return False
+    positions[i] += 1
+    for j in range(i + 1, r):
+        positions[j] = positions[j - 1] + 1
+    return True
+
+
+def _combinations_from(k: int, r: int, n: int) -> Iterator[list[int]]:
+    """Positions of the combinations of r elements taken from n, from the kth on."""
+    return _walk(_combination_positions(k, r, n), _next_combination, n)
+
+
+def _previous_combination(positions: list[int], n: int) -> bool:
+    """Step the positions of a combination to its lexicographic predecessor."""
+    r = len(positions)
+    i = r - 1
+    while i >= 0 and positions[i] == (positions[i - 1] + 1 if i else 0):
+        i -= 1
+    if i < 0:
+        return False
+    positions[i] -= 1
+    for j in range(i + 1, r):
+        positions[j] = n - r + j
+    return True
+
+
+def _combinations_before(k: int, r: int, n: int) -> Iterator[list[int]]:
+    """Positions of the combinations of r elements taken from n, from the kth back."""
+    return _walk(_combination_positions(k, r, n), _previous_combination, n)
+
+
+def _next_composition(positions: list[int], n: int) -> bool:
+    """Step the positions of a composition to its lexicographic successor."""
+    r = len(positions)
+    i = r - 1
+    while i >= 0 and positions[i] == n - 1:
+        i -= 1
+    if i < 0:
+        return False
+    positions[i] += 1
+    for j in range(i + 1, r):
+        positions[j] = positions[i]
+    return True
+
+
+def _compositions_from(k: int, r: int, n: int) -> Iterator[list[int]]:
+    """Positions of the compositions of r elements taken from n, from the kth on."""
+    return _walk(_composition_positions(k, r, n), _next_composition, n)
+
+
+def _previous_composition(positions: list[int], n: int) -> bool:
+    """Step the positions of a composition to its lexicographic predecessor."""
+    r = len(positions)
+    i = r - 1
+    while i >= 0 and positions[i] == (positions[i - 1] if i else 0):
+        i -= 1
+    if i < 0:
+        return False
+    positions[i] -= 1
+    for j in range(i + 1, r):
+        positions[j] = n - 1
+    return True
+
+
+def _compositions_before(k: int, r: int, n: int) -> Iterator[list[int]]:
+    """Positions of the compositions of r elements taken from n, from the kth back."""
+    return _walk(_composition_positions(k, r, n), _previous_composition, n)
 
 
-def _inverse_combination(combination: list, items: list | str) -> int:
+def _next_subset(positions: list[int], n: int) -> bool:
+    """Step the positions of a subset to its successor (binary increment)."""
+    t = 0
+    while t < len(positions) and positions[t] == t:
+        t += 1
+    if t == n:
+        positions.clear()
+        return False
+    positions[0:t] = (t,)
+    return True
+
+
+def _subsets_from(k: int, n: int) -> Iterator[list[int]]:
+    """Positions of the subsets of n elements, from the kth on."""
+    return _walk(_subset_positions(k, n), _next_subset, n)
+
+
+def _previous_subset(positions: list[int], n: int) -> bool:
+    """Step the positions of a subset to its predecessor (binary decrement)."""
+    if not positions:
+        return False
+    positions[0:1] = range(positions[0])
+    return True
+
+
+def _subsets_before(k: int, n: int) -> Iterator[list[int]]:
+    """Positions of the subsets of n elements, from the kth back."""
+    return _walk(_subset_positions(k, n), _previous_subset, n)
+
+
+def _plain_changes(k: int, r: int) -> tuple[list[int], list[bool]]:
     """
-    The index of combination in the ordered combinations of
-    elements in items.
+    The mixed-radix digits of the kth Johnson-Trotter permutation of r
+    elements (digit m is the offset of element m - 1 within the first m
+    elements) and the parity of each digit's prefix.
     """
+    digits = [0] * (r + 1)
+    even = [True] * (r + 1)
+    for m in range(r, 1, -1):
+        k, digits[m] = divmod(k, m)
+        even[m] = k % 2 == 0
+    return digits, even
 
-    def helper(combination, items):
-        if len(combination) == 0:
-            return 0
+
+def _permutations_from(
+    k: int,
+    r: int,
+    n: int,
+    deltas: bool = False,
+    groups: Callable[[int], Iterator[list[int]]] | None = None,
+) -> Iterator[list[int]] | Iterator[tuple]:
+    """
+    Positions of the permutations of r elements taken from n, from the
+    kth on. Within each combination, successive permutations differ by
+    an adjacent swap (Johnson-Trotter plain changes). With deltas, the
+    changes are yielded instead: ("reset", positions) for the first
+    permutation of each combination and ("swap", i, j) for each swap.
+    (groups(g), if given, walks the combinations from the gth on
+    instead of _combinations_from.)
+    """
+    f = _fact(r)
+    group, k = divmod(k, f)
+    if groups is None:
+        combinations = _combinations_from(group, r, n)
+    else:
+        combinations = groups(group)
+    positions = _johnson_trotter(k, list(next(combinations)))
+    digits, even = _plain_changes(k, r)
+    change = ("reset", positions)
+    while True:
+        yield change if deltas else positions
+        offset = 0
+        m = r
+        while m > 1 and digits[m] == m - 1:
+            if even[m]:
+                offset += 1
+            even[m] = not even[m]
+            digits[m] = 0
+            m -= 1
+        if m > 1:
+            c = digits[m]
+            i = offset + (m - c - 1 if even[m] else c)
+            j = i - 1 if even[m] else i + 1
+            positions[i], positions[j] = positions[j], positions[i]
+            digits[m] = c + 1
+            change = ("swap", j, i) if j < i else ("swap", i, j)
         else:
-            k = 0
-            r = len(combination)
-            n = len(items)
-            item_index = 0
-            while combination[0] != items[item_index]:
-                k += _n_c_r(n - item_index - 1, r - 1)
-                item_index += 1
-            return k + helper(combination[1:], items[(item_index + 1) :])
-
-    return helper(
-        _sorted_arrangement(combination, items),
-        items,
-    )
+            combination = next(combinations, None)
+            if combination is None:
+                return
+            positions = list(combination)
+            digits, even = _plain_changes(0, r)
+            change = ("reset", positions)
 
 
-def _permutation(k: int, r: int, items: list | str) -> list:
-    """The kth permutation of r elements taken from items."""
+def _permutations_before(
+    k: int,
+    r: int,
+    n: int,
+    groups: Callable[[int], Iterator[list[int]]] | None = None,
+) -> Iterator[list[int]]:
+    """
+    Positions of the permutations of r elements taken from n, from the
+    kth back (undoing the plain changes of _permutations_from). (groups(g),
+    if given, walks the combinations from the gth back instead of
+    _combinations_before.)
+    """
     f = _fact(r)
-    group = k // f
-    item = k % f
-    comb = _combination(group, r, items)
-    return _permutation_worker(item, comb)
+    group, k = divmod(k, f)
+    if groups is None:
+        combinations = _combinations_before(group, r, n)
+    else:
+        combinations = groups(group)
+    positions = _johnson_trotter(k, list(next(combinations)))
+    digits, even = _plain_changes(k, r)
+    while True:
+        yield positions
+        offset = 0
+        m = r
+        while m > 1 and digits[m] == 0:
+            if not even[m]:
+                offset += 1
+            even[m] = not even[m]
+            digits[m] = m - 1
+            m -= 1
+        if m > 1:
+            c = digits[m]
+            i = offset + (m - c - 1 if even[m] else c)
+            j = i + 1 if even[m] else i - 1
+            positions[i], positions[j] = positions[j], positions[i]
+            digits[m] = c - 1
+        else:
+            combination = next(combinations, None)
+            if combination is None:
+                return
+            positions = _johnson_trotter(f - 1, list(combination))
+            digits, even = _plain_changes(f - 1, r)
 
 
-def _inverse_permutation(permutation: list, items: list | str) -> int:
+def _compounds_from(
+    k: int, offsets: list[int], deltas: bool = False
+) -> Iterator[list[int]] | Iterator[tuple]:
     """
-    The index of permutation in the ordered permutations of
-    elements in `items`.
+    Positions of the compounds of n elements, from the kth on, where
+    offsets are the indices of the first compound of each length. (See
+    _permutations_from for deltas.)
     """
-    r = len(permutation)
-    if r == 0:
-        return 0
+    n = len(offsets) - 2
+    r = bisect_right(offsets, k) - 1
+    yield from _permutations_from(k - offsets[r], r, n, deltas)
+    for r in range(r + 1, n + 1):
+        yield from _permutations_from(0, r, n, deltas)
+
+
+def _compounds_before(k: int, offsets: list[int]) -> Iterator[list[int]]:
+    """
+    Positions of the compounds of n elements, from the kth back, where
+    offsets are the indices of the first compound of each length.
+    """
+    n = len(offsets) - 2
+    r = bisect_right(offsets, k) - 1
+    yield from _permutations_before(k - offsets[r], r, n)
+    for r in range(r - 1, -1, -1):
+        yield from _permutations_before(offsets[r + 1] - offsets[r] - 1, r, n)
+
+
+def _gray_subset_positions(k: int, n: int) -> list[int]:
+    """Positions of the kth subset of n elements in Gray code order."""
+    return _subset_positions(k ^ (k >> 1), n)
+
+
+def _gray_subset_index(positions: list[int]) -> int:
+    """The index of the subset at (unique) positions in Gray code order."""
+    g = _subset_index(positions)
+    k = 0
+    while g:
+        k ^= g
+        g >>= 1
+    return k
+
+
+def _gray_subsets_from(
+    k: int, n: int, deltas: bool = False
+) -> Iterator[list[int]] | Iterator[tuple]:
+    """
+    Positions of the subsets of n elements in Gray code order, from the
+    kth on. Successive subsets differ by one element: with deltas, the
+    changes are yielded instead, ("reset", positions) and then ("add", p)
+    or ("remove", p) for each step.
+    """
+    positions = _gray_subset_positions(k, n)
+    yield ("reset", positions) if deltas else positions
+    for k in range(k + 1, 1 << n):
+        # Step k flips the bit numbered by the trailing zeros of k.
+        p = (k & -k).bit_length() - 1
+        i = bisect_left(positions, p)
+        if i < len(positions) and positions[i] == p:
+            del positions[i]
+            change = ("remove", p)
+        else:
+            positions.insert(i, p)
+            change = ("add", p)
+        yield change if deltas else positions
+
+
+def _gray_subsets_before(k: int, n: int) -> Iterator[list[int]]:
+    """Positions of the subsets of n elements in Gray code order, from the kth back."""
+    positions = _gray_subset_positions(k, n)
+    yield positions
+    for k in range(k, 0, -1):
+        # Step k - 1 to k flipped the bit numbered by the trailing zeros of k.
+        p = (k & -k).bit_length() - 1
+        i = bisect_left(positions, p)
+        if i < len(positions) and positions[i] == p:
+            del positions[i]
+        else:
+            positions.insert(i, p)
+        yield positions
+
+
+def _revolving_door_positions(k: int, r: int, n: int) -> list[int]:
+    """
+    Positions of the kth combination of r elements taken from n in
+    revolving door order: those without n - 1, then those with it (the
+    rest of them in reverse order), recursively.
+    """
+    positions = [0] * r
+    # The combinations (of j) with largest position below m number
+    # d = C(m, j); the kth has largest position m for the greatest m
+    # with C(m, j) <= k, and is then (C(m + 1, j) - 1 - k)th among those.
+    m = n
+    d = _n_c_r(n, r)
+    for j in range(r, 0, -1):
+        while d > k:
+            above = d
+            d = d * (m - j) // m
+            m -= 1
+        positions[j - 1] = m
+        k = above - 1 - k
+        d = above - d
+    return positions
+
+
+def _revolving_door_index(positions: list[int]) -> int:
+    """
+    The index of the combination at (ascending) positions in revolving
+    door order.
+    """
+    k = 0
+    for j, position in enumerate(positions, 1):
+        k = _n_c_r(position + 1, j) - 1 - k
+    return k
+
+
+def _next_revolving_door(positions: list[int], r: int, n: int) -> tuple[int, int]:
+    """
+    Step the first r positions of a combination taken from n to their
+    successor in revolving door order (by the rule of Kreher and Stinson,
+    from the first slot i not holding i and the parity of r - i), giving
+    the positions removed and added.
+    """
+    i = 0
+    while i < r and positions[i] == i:
+        i += 1
+    if (r - i) % 2 == 0:
+        if i == 0:
+            positions[0] -= 1
+            return positions[0] + 1, positions[0]
+        elif i == 1:
+            positions[0] = 1
+            return 0, 1
+        else:
+            positions[i - 1] = i
+            positions[i - 2] = i - 1
+            return i - 2, i
+    p = positions[i]
+    following = positions[i + 1] if i + 1 < r else n
+    if following != p + 1:
+        if i:
+            positions[i - 1] = p
+        positions[i] = p + 1
+        return (i - 1 if i else p), p + 1
+    if i + 1 < r:
+        positions[i + 1] = p
+    positions[i] = i
+    return p + 1, i
+
+
+def _previous_revolving_door(positions: list[int], n: int) -> bool:
+    """
+    Step the positions of a combination to its predecessor in revolving
+    door order. Among the combinations with the same largest position m,
+    the rest run in reverse, so the rest step to their successor (taken
+    from m) unless they are the last, when the predecessor is the last
+    combination with largest position below m.
+    """
+    r = len(positions)
+    if r == 0 or positions == list(range(r)):
+        return False
+    top = positions[r - 1]
+    if r == 1:
+        positions[0] = top - 1
+    elif positions[r - 2] == top - 1 and (r == 2 or positions[r - 3] == r - 3):
+        positions[r - 2] = r - 2
+        positions[r - 1] = top - 1
     else:
-        sorted_permutation = _sorted_arrangement(permutation, items)
-        group = _inverse_combination(sorted_permutation, items)
-        return group * _fact(r) + _inverse_permutation_worker(
-            permutation, sorted_permutation
+        _next_revolving_door(positions, r - 1, top)
+    return True
+
+
+def _revolving_doors_from(
+    k: int, r: int, n: int, deltas: bool = False
+) -> Iterator[list[int]] | Iterator[tuple]:
+    """
+    Positions of the combinations of r elements taken from n in revolving
+    door order, from the kth on. Successive combinations differ by one
+    element: with deltas, the changes are yielded instead, ("reset",
+    positions) and then ("exchange", removed, added) for each step.
+    """
+    positions = _revolving_door_positions(k, r, n)
+    yield ("reset", positions) if deltas else positions
+    for _ in range(_n_c_r(n, r) - 1 - k):
+        change = _next_revolving_door(positions, r, n)
+        yield ("exchange", *change) if deltas else positions
+
+
+def _revolving_doors_before(k: int, r: int, n: int) -> Iterator[list[int]]:
+    """
+    Positions of the combinations of r elements taken from n in revolving
+    door order, from the kth back.
+    """
+    return _walk(_revolving_door_positions(k, r, n), _previous_revolving_door, n)
+
+
+def _gray_amalgam_positions(k: int, r: int, n: int) -> list[int]:
+    """
+    Positions of the kth amalgam of r elements taken from n in reflected
+    Gray code order: each digit runs down rather than up where the
+    number formed by the digits before it is odd.
+    """
+    positions = [0] * r
+    for i in range(r - 1, -1, -1):
+        k, digit = divmod(k, n)
+        positions[i] = n - 1 - digit if k % 2 else digit
+    return positions
+
+
+def _gray_amalgam_index(positions: list[int], n: int) -> int:
+    """The index of the amalgam at positions in reflected Gray code order."""
+    k = 0
+    for position in positions:
+        k = k * n + (n - 1 - position if k % 2 else position)
+    return k
+
+
+def _gray_amalgams_from(
+    k: int, r: int, n: int, deltas: bool = False
+) -> Iterator[list[int]] | Iterator[tuple]:
+    """
+    Positions of the amalgams of r elements taken from n in reflected
+    Gray code order, from the kth on. Successive amalgams differ in one
+    slot: with deltas, the changes are yielded instead, ("reset",
+    positions) and then ("set", i, old, new) for each step.
+    """
+    positions = _gray_amalgam_positions(k, r, n)
+    yield ("reset", positions) if deltas else positions
+    # The ordinary digits of k, and whether the number formed by the
+    # digits before each is odd.
+    digits = _amalgam_positions(k, r, n)
+    odd = [False] * (r + 1)
+    for i in range(r):
+        odd[i + 1] = (odd[i] and n % 2 == 1) != (digits[i] % 2 == 1)
+    while True:
+        # The digit that counts up in k + 1 moves one step; those after it
+        # wrap around, which (reflected) leaves them where they are.
+        i = r - 1
+        while i >= 0 and digits[i] == n - 1:
+            digits[i] = 0
+            i -= 1
+        if i < 0:
+            return
+        digits[i] += 1
+        for j in range(i, r):
+            odd[j + 1] = (odd[j] and n % 2 == 1) != (digits[j] % 2 == 1)
+        old = positions[i]
+        positions[i] = old - 1 if odd[i] else old + 1
+        yield ("set", i, old, positions[i]) if deltas else positions
+
+
+def _gray_amalgams_before(k: int, r: int, n: int) -> Iterator[list[int]]:
+    """
+    Positions of the amalgams of r elements taken from n in reflected
+    Gray code order, from the kth back.
+    """
+    positions = _gray_amalgam_positions(k, r, n)
+    yield positions
+    digits = _amalgam_positions(k, r, n)
+    odd = [False] * (r + 1)
+    for i in range(r):
+        odd[i + 1] = (odd[i] and n % 2 == 1) != (digits[i] % 2 == 1)
+    while True:
+        # The digit that counts down in k - 1 moves one step back; those
+        # after it wrap around, which (reflected) leaves them where they are.
+        i = r - 1
+        while i >= 0 and digits[i] == 0:
+            digits[i] = n - 1
+            i -= 1
+        if i < 0:
+            return
+        digits[i] -= 1
+        for j in range(i, r):
+            odd[j + 1] = (odd[j] and n % 2 == 1) != (digits[j] % 2 == 1)
+        positions[i] += 1 if odd[i] else -1
+        yield positions
+
+
+def _seeded(prefix_blocks: Iterator[tuple[tuple, Iterator[tuple]]]) -> Iterator[tuple]:
+    """Each prefix followed by each tuple of its block, block by block."""
+    return chain.from_iterable(
+        map(prefix.__add__, block) if prefix else block
+        for prefix, block in prefix_blocks
+    )
+
+
+def _amalgam_tuples(k: int, r: int, pool) -> Iterator[tuple]:
+    """
+    The amalgams of r elements taken from pool, from the kth on, as
+    tuples (by itertools.product, which runs in the same order).
+    """
+    if k == 0:
+        return product(pool, repeat=r)
+    positions = _amalgam_positions(k, r, len(pool))
+    # Fix the first i elements, then run element i on from its value (or
+    # past it, once the block for i + 1 is done), and the rest freely.
+    return _seeded(
+        (
+            tuple(pool[p] for p in positions[:i]),
+            product(pool[positions[i] + (i < r - 1) :], *repeat(pool, r - i - 1)),
         )
+        for i in range(r - 1, -1, -1)
+    )
 
 
-def _composition(k: int, r: int, items: list | str):
-    """The kth selection of r elements taken from items."""
-    n = len(items)
-    position = 0
-    d = _n_c_r(n + r - position - 2, r - 1)
+def _combination_tuples(k: int, r: int, pool) -> Iterator[tuple]:
+    """
+    The combinations of r elements taken from pool, from the kth on, as
+    tuples (by itertools.combinations, which runs in the same order).
+    """
+    if k == 0:
+        return combinations(pool, r)
+    positions = _combination_positions(k, r, len(pool))
+    return _seeded(
+        (
+            tuple(pool[p] for p in positions[:i]),
+            combinations(pool[positions[i] + (i < r - 1) :], r - i),
+        )
+        for i in range(r - 1, -1, -1)
+    )
 
-    while k >= d:
-        k -= d
-        position += 1
-        d = _n_c_r(n + r - position - 2, r - 1)
 
-    if r == 0:
-        return []
-    else:
-        tail = items[position:]
-        dummy = [items[position]]
-        dummy.extend(_composition(k, r - 1, tail))
-        return dummy
+def _composition_tuples(k: int, r: int, pool) -> Iterator[tuple]:
+    """
+    The compositions of r elements taken from pool, from the kth on, as
+    tuples (by itertools.combinations_with_replacement, which runs in the
+    same order).
+    """
+    if k == 0:
+        return combinations_with_replacement(pool, r)
+    positions = _composition_positions(k, r, len(pool))
+    return _seeded(
+        (
+            tuple(pool[p] for p in positions[:i]),
+            combinations_with_replacement(pool[positions[i] + (i < r - 1) :], r - i),
+        )
+        for i in range(r - 1, -1, -1)
+    )
+
+
+def _subset_tuples(k: int, pool) -> Iterator[tuple]:
+    """
+    The subsets of pool, from the kth on, as tuples. The subsets of up to
+    12 low elements are listed once; each subset of the rest, stepped to
+    by _next_subset, is then added to each of them.
+    """
+    low = [()]
+    for item in pool[:12]:
+        low += [subset + (item,) for subset in low]
+    if len(pool) <= 12:
+        return iter(low[k:])
+    high = pool[12:]
+    highs = (
+        tuple(map(high.__getitem__, positions))
+        for positions in _subsets_from(k >> 12, len(high))
+    )
+    first = next(highs)
+    return chain(
+        map(add, low[k & 0xFFF :], repeat(first)),
+        chain.from_iterable(map(add, low, repeat(subset)) for subset in highs),
+    )
+
+
+def _multiset(
+    items: list | str, item_positions: dict | None
+) -> tuple[list[int], list[int], list[int]]:
+    """
+    The kinds of (equal) items: the position of the first item of each
+    kind, the kind of the item at each position, and the number of items
+    of each kind.
+    """
+    firsts = []
+    kinds = []
+    counts = []
+    for position, item in enumerate(items):
+        if item_positions is None:
+            first = items.index(item)
+        else:
+            first = item_positions[item]
+        if first == position:
+            firsts.append(position)
+            counts.append(0)
+            kinds.append(len(firsts) - 1)
+        else:
+            kinds.append(kinds[first])
+        counts[kinds[position]] += 1
+    return firsts, kinds, counts
+
+
+def _multiset_kinds(
+    positions: list[int] | None, r: int, kinds: list[int], counts: list[int]
+) -> list[int] | None:
+    """
+    The kinds of the items at positions, if there are r of them and no
+    kind is used more often than its count; otherwise None.
+    """
+    if positions is None or len(positions) != r:
+        return None
+    chosen = [kinds[position] for position in positions]
+    used = [0] * len(counts)
+    for kind in chosen:
+        used[kind] += 1
+        if used[kind] > counts[kind]:
+            return None
+    return chosen
+
+
+def _multiset_completions(available: list[int], r: int) -> int:
+    """The number of ways to arrange r of the available items of each kind."""
+    return _multiset_permutations_count(tuple(sorted(m for m in available if m)), r)
+
+
+def _multiset_permutation_kinds(k: int, r: int, counts: list[int]) -> list[int]:
+    """
+    Kinds of the kth (lexicographic) permutation of r items taken from a
+    multiset with counts of each kind.
+    """
+    available = list(counts)
+    kinds = []
+    for length in range(r, 0, -1):
+        for kind, m in enumerate(available):
+            if m == 0:
+                continue
+            available[kind] -= 1
+            count = _multiset_completions(available, length - 1)
+            if k < count:
+                kinds.append(kind)
+                break
+            k -= count
+            available[kind] += 1
+    return kinds
+
+
+def _multiset_permutation_index(kinds: list[int], counts: list[int]) -> int:
+    """
+    The index of the permutation of a multiset with counts of each kind
+    with the given kinds.
+    """
+    available = list(counts)
+    k = 0
+    for i, chosen in enumerate(kinds):
+        length = len(kinds) - i - 1
+        for kind in range(chosen):
+            if available[kind]:
+                available[kind] -= 1
+                k += _multiset_completions(available, length)
+                available[kind] += 1
+        available[chosen] -= 1
+    return k
+
+
+def _multiset_arrangement(kinds: list[int], counts: list[int], descending: bool):
+    """
+    kinds followed by the rest of the multiset with counts of each kind,
+    in descending (or ascending) order.
+    """
+    rest = list(counts)
+    for kind in kinds:
+        rest[kind] -= 1
+    order = range(len(counts) - 1, -1, -1) if descending else range(len(counts))
+    return kinds + [kind for kind in order for _ in range(rest[kind])]
+
+
+def _next_multiset_arrangement(arrangement: list[int], r: int) -> bool:
+    """
+    Step a full arrangement of a multiset whose last items (after the
+    first r) are in descending order, so that its first r items are the
+    next permutation of r items, keeping the rest in descending order.
+    """
+    i = len(arrangement) - 2
+    while i >= 0 and arrangement[i] >= arrangement[i + 1]:
+        i -= 1
+    if i < 0:
+        return False
+    j = len(arrangement) - 1
+    while arrangement[j] <= arrangement[i]:
+        j -= 1
+    arrangement[i], arrangement[j] = arrangement[j], arrangement[i]
+    arrangement[i + 1 :] = reversed(arrangement[i + 1 :])
+    arrangement[r:] = reversed(arrangement[r:])
+    return True
+
+
+def _previous_multiset_arrangement(arrangement: list[int], r: int) -> bool:
+    """
+    Step a full arrangement of a multiset whose last items (after the
+    first r) are in ascending order, so that its first r items are the
+    previous permutation of r items, keeping the rest in ascending order.
+    """
+    i = len(arrangement) - 2
+    while i >= 0 and arrangement[i] <= arrangement[i + 1]:
+        i -= 1
+    if i < 0:
+        return False
+    j = len(arrangement) - 1
+    while arrangement[j] >= arrangement[i]:
+        j -= 1
+    arrangement[i], arrangement[j] = arrangement[j], arrangement[i]
+    arrangement[i + 1 :] = reversed(arrangement[i + 1 :])
+    arrangement[r:] = reversed(arrangement[r:])
+    return True
+
+
+def _multiset_permutations_from(
+    k: int, r: int, counts: list[int]
+) -> Iterator[list[int]]:
+    """
+    Kinds of the permutations of r items taken from a multiset with
+    counts of each kind, from the kth on.
+    """
+    kinds = _multiset_permutation_kinds(k, r, counts)
+    arrangement = _multiset_arrangement(kinds, counts, descending=True)
+    for _ in _walk(arrangement, _next_multiset_arrangement, r):
+        yield arrangement[:r]
+
+
+def _multiset_permutations_before(
+    k: int, r: int, counts: list[int]
+) -> Iterator[list[int]]:
+    """
+    Kinds of the permutations of r items taken from a multiset with
+    counts of each kind, from the kth back.
+    """
+    kinds = _multiset_permutation_kinds(k, r, counts)
+    arrangement = _multiset_arrangement(kinds, counts, descending=False)
+    for _ in _walk(arrangement, _previous_multiset_arrangement, r):
+        yield arrangement[:r]
+
+
+def _multiset_combination_kinds(
+    k: int, r: int, counts: list[int], table: list[list[int]]
+) -> list[int]:
+    """
+    Kinds (ascending) of the kth combination of r items taken from a
+    multiset with counts of each kind, where table is given by
+    _multiset_combinations_table. Taking more of an earlier kind comes
+    first, so the number of each kind is tried from the most down.
+    """
+    kinds = []
+    length = r
+    for kind, m in enumerate(counts):
+        for x in range(min(m, length), -1, -1):
+            count = table[kind + 1][length - x]
+            if k < count:
+                kinds += [kind] * x
+                length -= x
+                break
+            k -= count
+    return kinds
+
+
+def _multiset_combination_index(
+    kinds: list[int], counts: list[int], table: list[list[int]]
+) -> int:
+    """
+    The index of the combination of a multiset with counts of each kind
+    with the given (ascending) kinds.
+    """
+    taken = [0] * len(counts)
+    for kind in kinds:
+        taken[kind] += 1
+    k = 0
+    length = len(kinds)
+    for kind, m in enumerate(counts):
+        for x in range(min(m, length), taken[kind], -1):
+            k += table[kind + 1][length - x]
+        length -= taken[kind]
+    return k
+
+
+def _next_multiset_combination(kinds: list[int], available: list[int]) -> bool:
+    """
+    Step the (ascending) kinds of a combination of a multiset, with
+    available items of each kind left over, to its lexicographic
+    successor.
+    """
+    r = len(kinds)
+    d = len(available)
+    for i in range(r - 1, -1, -1):
+        available[kinds[i]] += 1
+        # The next kind with items left, if the slots after i can still
+        # be filled from it and the kinds after it.
+        kind = kinds[i] + 1
+        while kind < d and available[kind] == 0:
+            kind += 1
+        if kind < d and sum(available[kind:]) >= r - i:
+            for t in range(i, r):
+                while available[kind] == 0:
+                    kind += 1
+                kinds[t] = kind
+                available[kind] -= 1
+            return True
+    for kind in kinds:
+        available[kind] -= 1
+    return False
+
+
+def _previous_multiset_combination(kinds: list[int], available: list[int]) -> bool:
+    """
+    Step the (ascending) kinds of a combination of a multiset, with
+    available items of each kind left over, to its lexicographic
+    predecessor.
+    """
+    r = len(kinds)
+    for i in range(r - 1, -1, -1):
+        available[kinds[i]] += 1
+        # The previous kind with items left, no earlier than slot i - 1.
+        low = kinds[i - 1] if i else 0
+        kind = kinds[i] - 1
+        while kind >= low and available[kind] == 0:
+            kind -= 1
+        if kind >= low:
+            kinds[i] = kind
+            available[kind] -= 1
+            # Fill the slots after i with the latest kinds left.
+            last = len(available) - 1
+            for t in range(r - 1, i, -1):
+                while available[last] == 0:
+                    last -= 1
+                kinds[t] = last
+                available[last] -= 1
+            return True
+    for kind in kinds:
+        available[kind] -= 1
+    return False
+
+
+def _multiset_combinations_from(
+    k: int, r: int, counts: list[int], table: list[list[int]]
+) -> Iterator[list[int]]:
+    """
+    Kinds of the combinations of r items taken from a multiset with
+    counts of each kind, from the kth on.
+    """
+    kinds = _multiset_combination_kinds(k, r, counts, table)
+    available = list(counts)
+    for kind in kinds:
+        available[kind] -= 1
+    return _walk(kinds, _next_multiset_combination, available)
+
+
+def _multiset_combinations_before(
+    k: int, r: int, counts: list[int], table: list[list[int]]
+) -> Iterator[list[int]]:
+    """
+    Kinds of the combinations of r items taken from a multiset with
+    counts of each kind, from the kth back.
+    """
+    kinds = _multiset_combination_kinds(k, r, counts, table)
+    available = list(counts)
+    for kind in kinds:
+        available[kind] -= 1
+    return _walk(kinds, _previous_multiset_combination, available)
 
 
-def _inverse_composition(composition: list, items: list | str) -> int:
+def _constraints(
+    items: list | str,
+    item_positions: dict | None,
+    required: list | str,
+    forbidden: list | str,
+) -> tuple[list[int], list[int], list[int]]:
     """
-    The index of composition in the ordered compositions of
-    elements in `items`.
+    The (ascending) positions of the required items (the first position
+    of each), the positions of the other items that are free to be
+    chosen (all but the required and forbidden ones), and for each
+    position, its slot among the free positions (-1 for required items
+    and -2 for forbidden ones).
     """
+    required = _positions_of(required, items, item_positions)
+    if required is None:
+        raise ValueError("Required items must be among the items.")
+    required = sorted(set(required))
+    forbidden = _positions_of(forbidden, items, item_positions)
+    if forbidden is None:
+        raise ValueError("Forbidden items must be among the items.")
+    # Every item equal to a forbidden one shares its first position.
+    forbidden = set(forbidden)
+    firsts = _positions_of(items, items, item_positions)
+    slots = [-2 if first in forbidden else 0 for first in firsts]
+    for position in required:
+        if slots[position] == -2:
+            raise ValueError("Items cannot be both required and forbidden.")
+        slots[position] = -1
+    free = [position for position, slot in enumerate(slots) if slot == 0]
+    for slot, position in enumerate(free):
+        slots[position] = slot
+    return required, free, slots
 
-    def helper(composition, items):
-        if len(composition) == 0:
-            return 0
+
+def _constrained_positions(
+    slots: list[int], constraints: tuple[list[int], list[int], list[int]]
+) -> list[int]:
+    """
+    The (ascending) positions of the required items and the free items
+    at (ascending) slots, for constraints (see _constraints).
+    """
+    required, free, _ = constraints
+    return sorted(required + [free[slot] for slot in slots])
+
+
+def _free_slots(
+    positions: list[int], constraints: tuple[list[int], list[int], list[int]]
+) -> list[int] | None:
+    """
+    The (ascending) slots of the free items among (unique) positions, for
+    constraints (see _constraints); None unless positions include every
+    required item and no forbidden one.
+    """
+    required, _, slot_of = constraints
+    slots = []
+    found = 0
+    for position in positions:
+        slot = slot_of[position]
+        if slot >= 0:
+            slots.append(slot)
+        elif slot == -1:
+            found += 1
         else:
-            k = 0
-            n = len(items)
-            r = len(composition)
-            item_index = 0
-            while composition[0] != items[item_index]:
-                k += _n_c_r(n + r - item_index - 2, r - 1)
-                item_index += 1
-            return k + helper(composition[1:], items[item_index:])
+            return None
+    if found != len(required):
+        return None
+    slots.sort()
+    return slots
+
+
+def _constrained_combinations_from(
+    k: int, r: int, constraints: tuple[list[int], list[int], list[int]]
+) -> Iterator[list[int]]:
+    """
+    Positions of the combinations of r elements that meet constraints
+    (see _constraints), from the kth on.
+    """
+    q = len(constraints[0])
+    walk = _combinations_from(k, r - q, len(constraints[1]))
+    return (_constrained_positions(slots, constraints) for slots in walk)
 
-    return helper(_sorted_arrangement(composition, items), items)
 
+def _constrained_combinations_before(
+    k: int, r: int, constraints: tuple[list[int], list[int], list[int]]
+) -> Iterator[list[int]]:
+    """
+    Positions of the combinations of r elements that meet constraints
+    (see _constraints), from the kth back.
+    """
+    q = len(constraints[0])
+    walk = _combinations_before(k, r - q, len(constraints[1]))
+    return (_constrained_positions(slots, constraints) for slots in walk)
 
-def _subset(k: int, items: list | str) -> list:
-    """The kth subset of elements taken from items."""
-    return [items[i] for i in [j for j in range(len(items)) if k & (1 << j) != 0]]
+
+def _binomial_prefix_step(
+    prefix: tuple[int, int], j: int, m: int, drop: bool
+) -> tuple[int, int]:
+    """
+    From prefix, the sum of C(j, s) for s up to m and C(j, m), the same
+    for j - 1 and m (or m - 1, if drop).
+    """
+    # By Pascal's rule, the sum for j is twice that for j - 1 and m, less
+    # C(j - 1, m), and the sum for j - 1 and m - 1 is C(j - 1, m) less.
+    total, d = prefix
+    below = d * (j - m) // j
+    if drop:
+        return (total - below) // 2, d * m // j
+    return (total + below) // 2, below
 
 
-def _inverse_subset(subset: list, items: list | str) -> int:
+def _sized_subset_mask(k: int, n: int, a: int, b: int) -> int:
     """
-    The index of subset in the ordered subsets of
-    elements in items.
+    The bitmask of the kth subset of n elements, of a to b elements, in
+    binary order.
     """
+    # Below bit j, the subsets with bit j clear come first; there are as
+    # many as there are subsets of j elements of a to b elements, the
+    # difference of two sums of binomials stepped along with j.
+    mask = 0
+    if n == 0:
+        return mask
+    upper = _binomial_prefix(n - 1, b)
+    lower = _binomial_prefix(n - 1, a - 1)
+    for j in range(n - 1, -1, -1):
+        count = upper[0] - lower[0]
+        drop = k >= count
+        if drop:
+            k -= count
+            mask |= 1 << j
+        if j > 0:
+            upper = _binomial_prefix_step(upper, j, b, drop)
+            lower = _binomial_prefix_step(lower, j, a - 1, drop)
+        if drop:
+            a -= 1
+            b -= 1
+    return mask
 
-    def helper(subset, items):
-        k = 0
-        n = len(items)
-        power = 1
-        for index in range(n):
-            if items[index] in subset:
-                k += power
-            power *= 2
+
+def _sized_subset_positions(k: int, n: int, a: int, b: int) -> list[int]:
+    """
+    Positions of the kth subset of n elements, of a to b elements, in
+    binary order.
+    """
+    return _subset_positions(_sized_subset_mask(k, n, a, b), n)
+
+
+def _sized_subset_index(positions: list[int], n: int, a: int, b: int) -> int:
+    """
+    The index of the subset at (ascending) positions among the subsets of
+    n elements of a to b elements, in binary order.
+    """
+    k = 0
+    if n == 0:
         return k
+    chosen = set(positions)
+    upper = _binomial_prefix(n - 1, b)
+    lower = _binomial_prefix(n - 1, a - 1)
+    for j in range(n - 1, -1, -1):
+        drop = j in chosen
+        if drop:
+            k += upper[0] - lower[0]
+        if j > 0:
+            upper = _binomial_prefix_step(upper, j, b, drop)
+            lower = _binomial_prefix_step(lower, j, a - 1, drop)
+        if drop:
+            a -= 1
+            b -= 1
+    return k
+
+
+def _sized_subset_masks_from(k: int, n: int, a: int, b: int) -> Iterator[int]:
+    """
+    Bitmasks of the subsets of n elements, of a to b elements, from the
+    kth on (in binary order).
+    """
+    mask = _sized_subset_mask(k, n, a, b)
+    end = 1 << n
+    while mask < end:
+        yield mask
+        mask += 1
+        count = mask.bit_count()
+        # Every mask below mask + its lowest bit has at least as many bits.
+        while count > b and mask < end:
+            mask += mask & -mask
+            count = mask.bit_count()
+        # The next mask with enough bits sets the lowest clear bits.
+        for _ in range(a - count):
+            mask |= mask + 1
+
+
+def _sized_subsets_from(k: int, n: int, a: int, b: int) -> Iterator[list[int]]:
+    """
+    Positions of the subsets of n elements, of a to b elements, from the
+    kth on (in binary order).
+    """
+    masks = _sized_subset_masks_from(k, n, a, b)
+    return (_subset_positions(mask, n) for mask in masks)
+
+
+def _sized_subsets_before(k: int, n: int, a: int, b: int) -> Iterator[list[int]]:
+    """
+    Positions of the subsets of n elements, of a to b elements, from the
+    kth back (in binary order).
+    """
+    # Complements reverse the order, and take subsets of a to b elements
+    # to subsets of n - b to n - a elements.
+    a, b = max(a, 0), min(b, n)
+    full = (1 << n) - 1
+    k = _sized_subsets_count(n, a, b) - 1 - k
+    masks = _sized_subset_masks_from(k, n, n - b, n - a)
+    return (_subset_positions(full ^ mask, n) for mask in masks)
+
 
-    return helper(
-        _sorted_arrangement(list(set(subset)), items),
-        items,
+def _constrained_compound_positions(
+    k: int,
+    offsets: list[int],
+    constraints: tuple[list[int], list[int], list[int]],
+) -> list[int]:
+    """
+    Positions of the kth compound that meets constraints (see
+    _constraints), where offsets are the indices of the first compound of
+    each length (see _constrained_compound_offsets).
+    """
+    r = bisect_right(offsets, k) - 1
+    group, k = divmod(k - offsets[r], _fact(r))
+    q = len(constraints[0])
+    slots = _combination_positions(group, r - q, len(constraints[1]))
+    return _johnson_trotter(k, _constrained_positions(slots, constraints))
+
+
+def _constrained_compound_index(
+    positions: list[int],
+    offsets: list[int],
+    constraints: tuple[list[int], list[int], list[int]],
+) -> int:
+    """
+    The index of the compound at positions (which meet constraints; see
+    _constraints), where offsets are the indices of the first compound of
+    each length.
+    """
+    r = len(positions)
+    slots = sorted(range(r), key=positions.__getitem__)
+    group = _combination_index(
+        _free_slots(positions, constraints), len(constraints[1])
     )
+    return offsets[r] + group * _fact(r) + _johnson_trotter_index(slots)
 
 
-def _compound(k: int, items: list | str) -> list:
-    """The kth compound of elements taken from items."""
-    n = len(items)
-    for r in range(n):
-        group_size = _n_p_r(n, r)
-        if k >= group_size:
-            k -= group_size
-        else:
-            break
-    else:
-        r += 1
-    return _permutation(k, r, items)
+def _constrained_compounds_from(
+    k: int,
+    offsets: list[int],
+    constraints: tuple[list[int], list[int], list[int]],
+    deltas: bool = False,
+) -> Iterator[list[int]] | Iterator[tuple]:
+    """
+    Positions of the compounds that meet constraints (see _constraints),
+    from the kth on, where offsets are the indices of the first compound
+    of each length. (See _permutations_from for deltas.)
+    """
+    for r in range(bisect_right(offsets, k) - 1, len(offsets) - 1):
+        if offsets[r + 1] > offsets[r]:
+
+            def groups(group: int, r: int = r) -> Iterator[list[int]]:
+                return _constrained_combinations_from(group, r, constraints)
 
+            yield from _permutations_from(
+                max(k - offsets[r], 0), r, 0, deltas, groups
+            )
 
-def _inverse_compound(compound, items):
+
+def _constrained_compounds_before(
+    k: int,
+    offsets: list[int],
+    constraints: tuple[list[int], list[int], list[int]],
+) -> Iterator[list[int]]:
     """
-    The index of compound in the ordered compounds of
-    elements in items.
+    Positions of the compounds that meet constraints (see _constraints),
+    from the kth back, where offsets are the indices of the first
+    compound of each length.
     """
-    n = len(items)
-    k = sum([_n_p_r(n, r) for r in range(len(compound))])
-    return k + _inverse_permutation(compound, items)
+    for r in range(bisect_right(offsets, k) - 1, -1, -1):
+        if offsets[r + 1] > offsets[r]:
+
+            def groups(group: int, r: int = r) -> Iterator[list[int]]:
+                return _constrained_combinations_before(group, r, constraints)
+
+            k = min(k, offsets[r + 1] - 1)
+            yield from _permutations_before(k - offsets[r], r, 0, groups)
+
+
+def _range_length(r: range) -> int:
+    """The length of r (which may exceed sys.maxsize)."""
+    return max(0, (r.stop - r.start + r.step - (1 if r.step > 0 else -1)) // r.step)
 
 
 def _adjusted_index(k: int, n: int) -> int:
@@ -0,0 +1,172 @@
+"""
+Opt-in instrumentation of trotter's internal helpers.
+
+While an `instrumented()` block is active, the ranking, unranking,
+successor and counting helpers (in `helpers`, `counting` and `batch`)
+are replaced, wherever trotter modules refer to them, by wrappers that
+count calls, accumulate time and build histograms of argument sizes.
+The originals are put back when the block exits, so there is no cost
+at all when instrumentation is off.
+
+    with instrumented() as stats:
+        Permutations(5, range(20))[10**6]
+    stats.snapshot()["functions"]["_permutation_positions"]["calls"]
+"""
+
+import sys
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from inspect import isfunction, isgeneratorfunction, signature
+from time import perf_counter
+from typing import Callable, Iterator
+
+from . import batch, counting, helpers
+
+_MODULES = [helpers, counting, batch]
+
+_active = False
+
+
+class Stats:
+    """Call counts, times and argument size histograms for trotter helpers."""
+
+    def __init__(self):
+        self._calls = Counter()
+        self._seconds = defaultdict(float)
+        self._yielded = Counter()
+        self._histograms = defaultdict(lambda: defaultdict(Counter))
+        self._cache_start = {}
+
+    def _record(self, name: str, parameters: list[str], args, kwargs) -> None:
+        """Count a call of name and add its argument sizes to the histograms."""
+        self._calls[name] += 1
+        histograms = self._histograms[name]
+        for parameter, value in [*zip(parameters, args), *kwargs.items()]:
+            if isinstance(value, bool):
+                continue
+            if isinstance(value, int):
+                if parameter == "k" or value >= 1 << 16:
+                    histograms[f"{parameter}.bit_length"][value.bit_length()] += 1
+                else:
+                    histograms[parameter][value] += 1
+            elif hasattr(value, "__len__"):
+                histograms[f"len({parameter})"][len(value)] += 1
+
+    def snapshot(self) -> dict:
+        """
+        The statistics so far, as a dict: per function, the number of calls,
+        the cumulative seconds spent in them (and for generators, the
+        number of values they yielded) and histograms of argument sizes
+        (the bit length of indices k and of other large integers, the
+        values of other integers and the lengths of sequences); per cached
+        function, hits and misses since the block began, and the current
+        and maximum cache size.
+        """
+        functions = {}
+        for name, calls in sorted(self._calls.items()):
+            functions[name] = {
+                "calls": calls,
+                "seconds": self._seconds[name],
+                "histograms": {
+                    parameter: dict(sorted(histogram.items()))
+                    for parameter, histogram in self._histograms[name].items()
+                },
+            }
+            if name in self._yielded:
+                functions[name]["yielded"] = self._yielded[name]
+        caches = {}
+        for name, (cached, hits, misses) in self._cache_start.items():
+            info = cached.cache_info()
+            caches[name] = {
+                "hits": info.hits - hits,
+                "misses": info.misses - misses,
+                "size": info.currsize,
+                "maxsize": info.maxsize,
+            }
+        return {"functions": functions, "caches": caches}
+
+
+def _instrumented_functions() -> dict[str, Callable]:
+    """The helpers to instrument, by name."""
+    functions = {}
+    for module in _MODULES:
+        for name, value in vars(module).items():
+            original = getattr(value, "__wrapped__", value)
+            if isfunction(original) and original.__module__ == module.__name__:
+                functions[name] = value
+    return functions
+
+
+def _wrapper(name: str, func: Callable, stats: Stats) -> Callable:
+    """func, counted and timed in stats."""
+    original = getattr(func, "__wrapped__", func)
+    parameters = list(signature(original).parameters)
+
+    if isgeneratorfunction(original):
+
+        @wraps(original)
+        def wrapper(*args, **kwargs) -> Iterator:
+            stats._record(name, parameters, args, kwargs)
+            began = perf_counter()
+            iterator = func(*args, **kwargs)
+            try:
+                while True:
+                    value = next(iterator)
+                    stats._seconds[name] += perf_counter() - began
+                    stats._yielded[name] += 1
+                    yield value
+                    began = perf_counter()
+            except StopIteration:
+                stats._seconds[name] += perf_counter() - began
+
+    else:
+
+        @wraps(original)
+        def wrapper(*args, **kwargs):
+            stats._record(name, parameters, args, kwargs)
+            began = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats._seconds[name] += perf_counter() - began
+
+    return wrapper
+
+
+@contextmanager
+def instrumented() -> Iterator[Stats]:
+    """
+    Instrument trotter's helpers for the duration of the block, yielding
+    the Stats collected (see Stats.snapshot).
+    """
+    global _active
+    if _active:
+        raise RuntimeError("trotter is already being instrumented.")
+    stats = Stats()
+    functions = _instrumented_functions()
+    wrappers = {name: _wrapper(name, func, stats) for name, func in functions.items()}
+    for name, func in functions.items():
+        if hasattr(func, "cache_info"):
+            info = func.cache_info()
+            stats._cache_start[name] = (func, info.hits, info.misses)
+
+    # Rebind every reference to a helper held by a trotter module.
+    patched = []
+    modules = [
+        module
+        for module_name, module in list(sys.modules.items())
+        if module_name == "trotter" or module_name.startswith("trotter.")
+    ]
+    for module in modules:
+        for name, func in functions.items():
+            if vars(module).get(name) is func:
+                setattr(module, name, wrappers[name])
+                patched.append((module, name, func))
+    _active = True
+    try:
+        yield stats
+    finally:
+        for module, name, func in patched:
+            setattr(module, name, func)
+        _active = False
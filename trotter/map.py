@@ -0,0 +1,86 @@
+from functools import partial
+from typing import Any, Callable, Iterator
+
+from .combinatoric import Combinatoric
+
+
+def _mapped(func: Callable, convert: Callable, positions: list[int]) -> Any:
+    """func of the arrangement convert gives for positions."""
+    return func(convert(positions))
+
+
+class Map(Combinatoric):
+    """A pseudo-list containing func of each arrangement of a pseudo-list.
+
+    func is applied lazily, to each arrangement as it is needed. Finding
+    the index of an element (or testing for one) needs inverse, taking
+    an element back to the arrangement it came from.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        combinatoric: Combinatoric,
+        inverse: Callable | None = None,
+    ):
+        self._func = func
+        self._inverse = inverse
+        self._combinatoric = combinatoric
+        self._items = combinatoric._items
+        self._item_positions = combinatoric._item_positions
+        self._output = combinatoric._output
+        self._order = combinatoric._order
+        self._batched = combinatoric._batched
+        self._fixed_length = combinatoric._fixed_length
+        self._length = combinatoric._length
+
+    def _converter(self):
+        return partial(_mapped, self._func, self._combinatoric._converter())
+
+    def _positions(self, k: int) -> list[int]:
+        return self._combinatoric._positions(k)
+
+    def _positions_many(self, indices):
+        return self._combinatoric._positions_many(indices)
+
+    def _row_width(self) -> int:
+        return self._combinatoric._row_width()
+
+    def _indices_many(self, positions):
+        return self._combinatoric._indices_many(positions)
+
+    def _positions_from(self, k: int) -> Iterator[list[int]]:
+        return self._combinatoric._positions_from(k)
+
+    def _positions_before(self, k: int) -> Iterator[list[int]]:
+        return self._combinatoric._positions_before(k)
+
+    def _arrangements_from(self, k: int) -> Iterator:
+        return map(self._func, self._combinatoric._arrangements_from(k))
+
+    def _tuples_from(self, k: int, pool) -> Iterator[tuple] | None:
+        return self._combinatoric._tuples_from(k, pool)
+
+    def __repr__(self):
+        return "Map({}, {}{})".format(
+            getattr(self._func, "__qualname__", repr(self._func)),
+            repr(self._combinatoric),
+            "" if self._inverse is None else ", inverse={}".format(
+                getattr(self._inverse, "__qualname__", repr(self._inverse))
+            ),
+        )
+
+    def __str__(self):
+        return "A pseudo-list containing {} values of {} over {}.".format(
+            self._length,
+            getattr(self._func, "__qualname__", repr(self._func)),
+            repr(self._combinatoric),
+        )
+
+    def _member_positions(self, arrangement: Any) -> Any:
+        if self._inverse is None:
+            raise ValueError("Elements of a Map can only be found given an inverse.")
+        return self._combinatoric._member_positions(self._inverse(arrangement))
+
+    def _index(self, positions: list[int]) -> int:
+        return self._combinatoric._index(positions)
@@ -0,0 +1,69 @@
+from typing import Iterator
+
+from .batch import _indices_by_row, _positions_by_row
+from .helpers import (
+    _item_positions,
+    _multiset,
+    _multiset_kinds,
+    _multiset_permutation_kinds,
+    _multiset_permutation_index,
+    _multiset_permutations_from,
+    _multiset_permutations_before,
+)
+from .combinatoric import Combinatoric
+from .counting import _multiset_permutations_count
+
+
+class MultisetPermutations(Combinatoric):
+    """A pseudo-list containing the distinct permutations of items.
+
+    A permutation is an arrangement in which order is important and
+    repetition is not allowed. Here, equal items are interchangeable,
+    so each distinct arrangement appears once, however often its items
+    are repeated.
+    """
+
+    def __init__(self, r: int, items: list | str, output: str = "items"):
+        self._r = r
+        self._items = items
+        self._item_positions = _item_positions(items)
+        self._set_output(output)
+        self._firsts, self._kinds, self._counts = _multiset(
+            items, self._item_positions
+        )
+        self._length = _multiset_permutations_count(tuple(sorted(self._counts)), r)
+
+    def _positions(self, k: int) -> list[int]:
+        kinds = _multiset_permutation_kinds(k, self._r, self._counts)
+        return [self._firsts[kind] for kind in kinds]
+
+    def _positions_many(self, indices):
+        return _positions_by_row(indices, self._positions, self._r)
+
+    def _indices_many(self, positions):
+        return _indices_by_row(positions, self._row_index, self._length)
+
+    def _positions_from(self, k: int) -> Iterator[list[int]]:
+        walk = _multiset_permutations_from(k, self._r, self._counts)
+        return ([self._firsts[kind] for kind in kinds] for kinds in walk)
+
+    def _positions_before(self, k: int) -> Iterator[list[int]]:
+        walk = _multiset_permutations_before(k, self._r, self._counts)
+        return ([self._firsts[kind] for kind in kinds] for kinds in walk)
+
+    def __repr__(self):
+        return super()._repr("MultisetPermutations")
+
+    def __str__(self):
+        return super()._str("multiset permutations")
+
+    def _member_positions(self, arrangement: list | str) -> list[int] | None:
+        return self._allowed(self._lookup(arrangement))
+
+    def _allowed(self, positions: list[int] | None) -> list[int] | None:
+        kinds = _multiset_kinds(positions, self._r, self._kinds, self._counts)
+        return None if kinds is None else [self._firsts[kind] for kind in kinds]
+
+    def _index(self, positions: list[int]) -> int:
+        kinds = [self._kinds[position] for position in positions]
+        return _multiset_permutation_index(kinds, self._counts)
@@ -0,0 +1,105 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import reduce
+from os import cpu_count
+from typing import Any, Callable, Iterator
+
+
+def _map_shard(func: Callable, shard) -> list:
+    """func applied to each arrangement in shard (run in a worker)."""
+    return [func(arrangement) for arrangement in shard]
+
+
+def _reduce_shard(func: Callable, reducer: Callable, shard) -> Any:
+    """reducer folded over func of each arrangement in shard (run in a worker)."""
+    return reduce(reducer, map(func, shard))
+
+
+def _chunks(combinatoric, chunksize: int) -> Iterator:
+    """Consecutive views of combinatoric of (at most) chunksize arrangements."""
+    for start in range(0, combinatoric._length, chunksize):
+        yield combinatoric[start : (start + chunksize)]
+
+
+def _default_chunksize(combinatoric, workers: int) -> int:
+    """A chunk size giving each worker a few chunks."""
+    return max(1, -(-combinatoric._length // (4 * workers)))
+
+
+def _take_chunks(chunks: Iterator, count: int) -> list:
+    """Up to count more chunks."""
+    return [chunk for _, chunk in zip(range(count), chunks)]
+
+
+def _run(
+    combinatoric,
+    task: Callable,
+    args: tuple,
+    workers: int | None,
+    chunksize: int | None,
+    ordered: bool,
+) -> Iterator:
+    """
+    The results of task(*args, chunk) for consecutive chunks of
+    combinatoric, computed in a process pool. At most two chunks per
+    worker are in flight at a time; closing the iterator cancels the
+    rest.
+    """
+    workers = workers or cpu_count() or 1
+    chunksize = chunksize or _default_chunksize(combinatoric, workers)
+    chunks = _chunks(combinatoric, chunksize)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque(
+            executor.submit(task, *args, chunk)
+            for chunk in _take_chunks(chunks, 2 * workers)
+        )
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [future for future in pending if future in finished]
+                for future in done:
+                    pending.remove(future)
+            for future in done:
+                yield future.result()
+                for chunk in _take_chunks(chunks, 1):
+                    pending.append(executor.submit(task, *args, chunk))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _parallel_map(
+    combinatoric,
+    func: Callable,
+    workers: int | None,
+    chunksize: int | None,
+    ordered: bool,
+) -> Iterator:
+    """func of each arrangement in combinatoric, computed in a process pool."""
+    runs = _run(combinatoric, _map_shard, (func,), workers, chunksize, ordered)
+    try:
+        for results in runs:
+            yield from results
+    finally:
+        runs.close()
+
+
+def _parallel_reduce(
+    combinatoric,
+    func: Callable,
+    reducer: Callable,
+    initial: Any,
+    workers: int | None,
+    chunksize: int | None,
+) -> Any:
+    """
+    reducer folded (from initial) over func of each arrangement in
+    combinatoric, with chunks reduced in a process pool.
+    """
+    return reduce(
+        reducer,
+        _run(combinatoric, _reduce_shard, (func, reducer), workers, chunksize, True),
+        initial,
+    )
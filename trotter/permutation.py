@@ -1,13 +1,16 @@
+from typing import Iterator
+
+from .batch import _permutation_positions_many, _permutation_indices_many
 from .helpers import (
-    _adjusted_index,
-    _arrangement,
-    _n_p_r,
-    _items_are_unique,
-    _items_exist_in_universal,
-    _permutation,
-    _inverse_permutation,
+    _checked_positions,
+    _item_positions,
+    _permutation_positions,
+    _permutation_index,
+    _permutations_from,
+    _permutations_before,
 )
 from .combinatoric import Combinatoric
+from .counting import _n_p_r
 
 
 class Permutations(Combinatoric):
@@ -17,21 +20,32 @@ class Permutations(Combinatoric):
     repetition is not allowed.
     """
 
-    def __init__(self, r: int, items: list | str):
+    def __init__(self, r: int, items: list | str, output: str = "items"):
         self._r = r
         self._items = items
+        self._item_positions = _item_positions(items)
+        self._set_output(output)
         self._length = _n_p_r(len(items), r)
 
-    def __getitem__(self, k: int | slice) -> list | str:
-        if isinstance(k, slice):
-            return super()._slice(k)
-        else:
-            dummy = _permutation(
-                _adjusted_index(k, self._length),
-                self._r,
-                self._items,
-            )
-            return _arrangement(self._items, dummy)
+    def _positions(self, k: int) -> list[int]:
+        return _permutation_positions(k, self._r, len(self._items))
+
+    def _positions_many(self, indices):
+        return _permutation_positions_many(indices, self._r, len(self._items))
+
+    def _indices_many(self, positions):
+        return _permutation_indices_many(
+            positions, self._r, len(self._items), self._length
+        )
+
+    def _positions_from(self, k: int) -> Iterator[list[int]]:
+        return _permutations_from(k, self._r, len(self._items))
+
+    def _positions_before(self, k: int) -> Iterator[list[int]]:
+        return _permutations_before(k, self._r, len(self._items))
+
+    def _deltas_from(self, k: int) -> Iterator[tuple]:
+        return _permutations_from(k, self._r, len(self._items), deltas=True)
 
     def __repr__(self):
         return super()._repr("Permutations")
@@ -39,14 +53,8 @@ class Permutations(Combinatoric):
     def __str__(self):
         return super()._str("permutations")
 
-    def __contains__(self, permutation: list) -> bool:
-        return _items_exist_in_universal(
-            permutation, self._items
-        ) and _items_are_unique(permutation)
+    def _member_positions(self, arrangement: list | str) -> list[int] | None:
+        return _checked_positions(self._lookup(arrangement), self._r, unique=True)
 
-    def index(self, permutation):
-        return (
-            _inverse_permutation(permutation, self._items)
-            if permutation in self
-            else -1
-        )
+    def _index(self, positions: list[int]) -> int:
+        return _permutation_index(positions, len(self._items))
@@ -0,0 +1,132 @@
+from functools import partial
+from itertools import chain, repeat
+from typing import Callable, Iterator
+
+from .combinatoric import Combinatoric
+
+
+def _product_walk(
+    starts: list[int], walks: list[Callable[[int], Iterator]], restarts: list[int]
+) -> Iterator[tuple]:
+    """
+    Tuples of an element of each of walks, the last varying fastest, from
+    walks[i](starts[i]) on (each walk starting again from restarts[i] once
+    a pass over it ends).
+    """
+    *outer, last = walks
+    if not outer:
+        return zip(last(starts[0]))
+    return chain.from_iterable(_product_blocks(starts, outer, last, restarts))
+
+
+def _product_blocks(
+    starts: list[int],
+    outer: list[Callable[[int], Iterator]],
+    last: Callable[[int], Iterator],
+    restarts: list[int],
+) -> Iterator[Iterator[tuple]]:
+    """
+    For each tuple of elements of the outer walks (see _product_walk), the
+    tuples extending it by each element of a pass over the last walk.
+    """
+    start = starts[-1]
+    for prefix in _product_walk(starts[:-1], outer, restarts[:-1]):
+        yield zip(*map(repeat, prefix), last(start))
+        start = restarts[-1]
+
+
+def _converted_parts(converters: list[Callable], parts: tuple) -> tuple:
+    """A tuple of each of parts (item positions) converted by its converter."""
+    return tuple(convert(part) for convert, part in zip(converters, parts))
+
+
+class Product(Combinatoric):
+    """A pseudo-list containing tuples of arrangements, one from each of
+    several pseudo-lists.
+
+    The tuples are in the order of nested loops, the last pseudo-list's
+    arrangement varying fastest, so the kth tuple is found by splitting
+    k into mixed-radix digits, one per pseudo-list.
+    """
+
+    _items = None
+    _item_positions = None
+    _batched = False
+
+    def __init__(self, *combinatorics: Combinatoric):
+        if not combinatorics:
+            raise ValueError("A Product needs at least one pseudo-list.")
+        self._combinatorics = combinatorics
+        self._length = 1
+        for combinatoric in combinatorics:
+            self._length *= combinatoric._length
+
+    def _digits(self, k: int) -> list[int]:
+        """The index in each pseudo-list of the parts of the kth tuple."""
+        digits = []
+        for combinatoric in reversed(self._combinatorics):
+            k, digit = divmod(k, combinatoric._length)
+            digits.append(digit)
+        digits.reverse()
+        return digits
+
+    def _converter(self):
+        return partial(
+            _converted_parts, [c._converter() for c in self._combinatorics]
+        )
+
+    def _positions(self, k: int) -> tuple:
+        return tuple(
+            combinatoric._positions(digit)
+            for combinatoric, digit in zip(self._combinatorics, self._digits(k))
+        )
+
+    def _positions_from(self, k: int) -> Iterator[tuple]:
+        return _product_walk(
+            self._digits(k),
+            [c._positions_from for c in self._combinatorics],
+            [0] * len(self._combinatorics),
+        )
+
+    def _positions_before(self, k: int) -> Iterator[tuple]:
+        return _product_walk(
+            self._digits(k),
+            [c._positions_before for c in self._combinatorics],
+            [c._length - 1 for c in self._combinatorics],
+        )
+
+    def _arrangements_from(self, k: int) -> Iterator[tuple]:
+        return _product_walk(
+            self._digits(k),
+            [c._arrangements_from for c in self._combinatorics],
+            [0] * len(self._combinatorics),
+        )
+
+    def __repr__(self):
+        return "Product({})".format(", ".join(map(repr, self._combinatorics)))
+
+    def __str__(self):
+        return "A pseudo-list containing {} tuples of arrangements from {}.".format(
+            self._length,
+            ", ".join(map(repr, self._combinatorics)),
+        )
+
+    def _member_positions(self, arrangement: tuple) -> tuple | None:
+        try:
+            if len(arrangement) != len(self._combinatorics):
+                return None
+        except TypeError:
+            return None
+        parts = []
+        for combinatoric, part in zip(self._combinatorics, arrangement):
+            positions = combinatoric._member_positions(part)
+            if positions is None:
+                return None
+            parts.append(positions)
+        return tuple(parts)
+
+    def _index(self, positions: tuple) -> int:
+        k = 0
+        for combinatoric, part in zip(self._combinatorics, positions):
+            k = k * combinatoric._length + combinatoric._index(part)
+        return k
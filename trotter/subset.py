@@ -1,36 +1,142 @@
+from typing import Iterator
+
+from .batch import (
+    _indices_by_row,
+    _positions_by_row,
+    _subset_positions_many,
+    _subset_indices_many,
+    _gray_subset_positions_many,
+    _gray_subset_indices_many,
+)
 from .helpers import (
-    _adjusted_index,
+    _checked_positions,
+    _item_positions,
     _arrangement,
-    _items_exist_in_universal,
-    _items_are_unique,
-    _subset,
-    _inverse_subset,
+    _subset_positions,
+    _subset_index,
+    _subsets_from,
+    _subsets_before,
+    _subset_tuples,
+    _gray_subset_positions,
+    _gray_subset_index,
+    _gray_subsets_from,
+    _gray_subsets_before,
+    _constrained_positions,
+    _free_slots,
+    _sized_subset_positions,
+    _sized_subset_index,
+    _sized_subsets_from,
+    _sized_subsets_before,
 )
-from .combinatoric import Combinatoric
+from .combinatoric import Combinatoric, _output_argument
+from .counting import _subsets_count, _sized_subsets_count
 
 
 class Subsets(Combinatoric):
     """A pseudo-list containing subsets of items.
 
     A subset is an arrangement in which order is not important,
-    repetition is not allowed and length is not specified.
+    repetition is not allowed and length is not specified. In "gray"
+    order, successive subsets differ by adding or removing one item.
+    Subsets may be constrained to have min_size to max_size items, and to
+    include every one of the required items and none of the forbidden
+    items; only those are counted and indexed, in binary order.
     """
 
-    def __init__(self, items: list | str):
-        self._items = items
-        self._length = 1 << len(items)
+    _outputs = ("items", "positions", "bitmask")
+    _order = "binary"
+    _orders = ("binary", "gray")
+    _fixed_length = False
 
-    def __getitem__(self, k: int | slice) -> list | str:
-        if isinstance(k, slice):
-            return super()._slice(k)
+    def __init__(
+        self,
+        items: list | str,
+        output: str = "items",
+        order: str = "binary",
+        min_size: int | None = None,
+        max_size: int | None = None,
+        required: list | str | None = None,
+        forbidden: list | str | None = None,
+    ):
+        self._items = items
+        self._item_positions = _item_positions(items)
+        self._set_output(output)
+        self._set_order(order)
+        self._set_constraints(required, forbidden, min_size, max_size)
+        if self._constraints is None:
+            self._length = _subsets_count(len(items))
         else:
-            dummy = _subset(_adjusted_index(k, self._length), self._items)
-            return _arrangement(self._items, dummy)
+            # The sizes of the subsets of free items that complete them.
+            q = len(self._constraints[0])
+            self._sizes = (
+                (min_size or 0) - q,
+                (len(items) if max_size is None else max_size) - q,
+            )
+            self._length = _sized_subsets_count(
+                len(self._constraints[1]), *self._sizes
+            )
+
+    def _positions(self, k: int) -> list[int]:
+        if self._constraints is not None:
+            m = len(self._constraints[1])
+            slots = _sized_subset_positions(k, m, *self._sizes)
+            return _constrained_positions(slots, self._constraints)
+        if self._order == "gray":
+            return _gray_subset_positions(k, len(self._items))
+        return _subset_positions(k, len(self._items))
+
+    def _positions_many(self, indices):
+        if self._constraints is not None:
+            return _positions_by_row(indices, self._positions, len(self._items))
+        if self._order == "gray":
+            return _gray_subset_positions_many(indices, len(self._items))
+        return _subset_positions_many(indices, len(self._items))
+
+    def _row_width(self) -> int:
+        return len(self._items)
+
+    def _indices_many(self, positions):
+        if self._constraints is not None:
+            return _indices_by_row(positions, self._row_index, self._length)
+        if self._order == "gray":
+            return _gray_subset_indices_many(
+                positions, len(self._items), self._length
+            )
+        return _subset_indices_many(positions, len(self._items), self._length)
+
+    def _positions_from(self, k: int) -> Iterator[list[int]]:
+        if self._constraints is not None:
+            m = len(self._constraints[1])
+            walk = _sized_subsets_from(k, m, *self._sizes)
+            return (_constrained_positions(slots, self._constraints) for slots in walk)
+        if self._order == "gray":
+            return _gray_subsets_from(k, len(self._items))
+        return _subsets_from(k, len(self._items))
+
+    def _positions_before(self, k: int) -> Iterator[list[int]]:
+        if self._constraints is not None:
+            m = len(self._constraints[1])
+            walk = _sized_subsets_before(k, m, *self._sizes)
+            return (_constrained_positions(slots, self._constraints) for slots in walk)
+        if self._order == "gray":
+            return _gray_subsets_before(k, len(self._items))
+        return _subsets_before(k, len(self._items))
+
+    def _tuples_from(self, k: int, pool) -> Iterator[tuple] | None:
+        if self._order != "binary" or self._constraints is not None:
+            return None
+        return _subset_tuples(k, pool)
+
+    def _deltas_from(self, k: int) -> Iterator[tuple]:
+        if self._order != "gray":
+            return super()._deltas_from(k)
+        return _gray_subsets_from(k, len(self._items), deltas=True)
 
     def __repr__(self):
         arrangement = _arrangement(self._items, self._items)
-        return "Subsets({})".format(
-            f'"{arrangement}' if isinstance(arrangement, str) else arrangement,
+        return "Subsets({}{})".format(
+            f'"{arrangement}"' if isinstance(arrangement, str) else arrangement,
+            _output_argument(self),
         )
 
     def __str__(self):
@@ -40,10 +146,23 @@ class Subsets(Combinatoric):
             f'"{arrangement}"' if isinstance(arrangement, str) else arrangement,
         )
 
-    def __contains__(self, subset: list) -> bool:
-        return _items_exist_in_universal(subset, self._items) and _items_are_unique(
-            subset
-        )
+    def _member_positions(self, arrangement: list | str) -> list[int] | None:
+        return self._allowed(self._lookup(arrangement))
+
+    def _allowed(self, positions: list[int] | None) -> list[int] | None:
+        positions = _checked_positions(positions, None, unique=True)
+        if positions is None or self._constraints is None:
+            return positions
+        slots = _free_slots(positions, self._constraints)
+        if slots is None or not self._sizes[0] <= len(slots) <= self._sizes[1]:
+            return None
+        return positions
 
-    def index(self, subset: list) -> int:
-        return _inverse_subset(subset, self._items) if subset in self else -1
+    def _index(self, positions: list[int]) -> int:
+        if self._constraints is not None:
+            m = len(self._constraints[1])
+            slots = _free_slots(positions, self._constraints)
+            return _sized_subset_index(slots, m, *self._sizes)
+        if self._order == "gray":
+            return _gray_subset_index(positions)
+        return _subset_index(positions)
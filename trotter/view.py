@@ -0,0 +1,125 @@
+from typing import Iterator
+
+from .batch import _range_indices_many, _range_ranks_many
+from .combinatoric import Combinatoric, _take
+from .helpers import _range_length
+
+
+class View(Combinatoric):
+    """A lazy view of a slice of a pseudo-list.
+
+    Arrangements are looked up in the underlying pseudo-list only when
+    they are needed. (Views are what slicing a pseudo-list returns.)
+    """
+
+    def __init__(self, combinatoric: Combinatoric, indices: range):
+        self._combinatoric = combinatoric
+        self._indices = indices
+        self._items = combinatoric._items
+        self._item_positions = combinatoric._item_positions
+        self._output = combinatoric._output
+        self._order = combinatoric._order
+        self._batched = combinatoric._batched
+        self._fixed_length = combinatoric._fixed_length
+        self._length = _range_length(indices)
+
+    def _converter(self):
+        return self._combinatoric._converter()
+
+    def _lookup(self, arrangement) -> list[int] | None:
+        return self._combinatoric._lookup(arrangement)
+
+    def _positions(self, k: int) -> list[int]:
+        return self._combinatoric._positions(self._indices[k])
+
+    def _positions_many(self, indices):
+        return self._combinatoric._positions_many(
+            _range_indices_many(indices, self._indices, self._combinatoric._length)
+        )
+
+    def _row_width(self) -> int:
+        return self._combinatoric._row_width()
+
+    def _indices_many(self, positions):
+        return _range_ranks_many(
+            self._combinatoric._indices_many(positions), self._indices, self._length
+        )
+
+    def _positions_from(self, k: int) -> Iterator[list[int]]:
+        return self._walk(self._indices[k:])
+
+    def _positions_before(self, k: int) -> Iterator[list[int]]:
+        return self._walk(self._indices[k::-1])
+
+    def _walk(self, indices: range) -> Iterator[list[int]]:
+        """
+        Item positions of the arrangements at indices (of the underlying
+        pseudo-list), by successor or predecessor for steps of 1 or -1.
+        """
+        combinatoric = self._combinatoric
+        length = _range_length(indices)
+        if length == 0:
+            return iter(())
+        elif indices.step == 1:
+            return _take(combinatoric._positions_from(indices.start), length)
+        elif indices.step == -1:
+            return _take(combinatoric._positions_before(indices.start), length)
+        else:
+            return (combinatoric._positions(i) for i in indices)
+
+    def _arrangements_from(self, k: int) -> Iterator:
+        indices = self._indices[k:]
+        if indices.step == 1:
+            return _take(
+                self._combinatoric._arrangements_from(indices.start),
+                self._length - k,
+            )
+        else:
+            return map(self._converter(), self._positions_from(k))
+
+    def _tuples_from(self, k: int, pool) -> Iterator[tuple] | None:
+        indices = self._indices[k:]
+        if indices.step != 1:
+            return None
+        tuples = self._combinatoric._tuples_from(indices.start, pool)
+        return None if tuples is None else _take(tuples, self._length - k)
+
+    def _deltas_from(self, k: int) -> Iterator[tuple]:
+        indices = self._indices[k:]
+        if indices.step != 1:
+            raise ValueError("Only views with a step of 1 change by single steps.")
+        return _take(
+            self._combinatoric._deltas_from(indices.start), self._length - k
+        )
+
+    def __repr__(self):
+        start, stop, step = self._indices.start, self._indices.stop, self._indices.step
+        return "{}[{}:{}{}]".format(
+            repr(self._combinatoric),
+            start,
+            stop,
+            "" if step == 1 else f":{step}",
+        )
+
+    def __str__(self):
+        return "A pseudo-list containing {} arrangements taken from {}.".format(
+            self._length,
+            repr(self._combinatoric),
+        )
+
+    def index(self, arrangement: list | str) -> int:
+        k = self._combinatoric.index(arrangement)
+        return self._indices.index(k) if k != -1 and k in self._indices else -1
+
+    def _member_positions(self, arrangement: list | str) -> list[int] | None:
+        combinatoric = self._combinatoric
+        positions = combinatoric._member_positions(arrangement)
+        if positions is None or combinatoric._index(positions) not in self._indices:
+            return None
+        return positions
+
+    def _index(self, positions: list[int]) -> int:
+        return self._indices.index(self._combinatoric._index(positions))
+
+    def _slice(self, s: slice):
+        return View(self._combinatoric, self._indices[s])